@@ -14,21 +14,25 @@ Usage:
     Gates.provider_event_authenticity(body, signature, secret)
 """
 
+import importlib
+import sys
 
-def __getattr__(name):
-    if name == "Gates":
-        from guestman.gates import Gates
-
-        return Gates
-    if name == "GateError":
-        from guestman.gates import GateError
+_LAZY = {
+    "Gates": ("guestman.gates", "Gates"),
+    "GateError": ("guestman.gates", "GateError"),
+    "GateResult": ("guestman.gates", "GateResult"),
+}
 
-        return GateError
-    if name == "GateResult":
-        from guestman.gates import GateResult
 
-        return GateResult
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+def __getattr__(name):
+    try:
+        module_path, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_path), attr)
+    # Bind on the module so later lookups skip __getattr__
+    setattr(sys.modules[__name__], name, value)
+    return value
 
 
 __all__ = ["Gates", "GateError", "GateResult"]
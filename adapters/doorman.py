@@ -2,36 +2,57 @@
 
 from __future__ import annotations
 
-import uuid as uuid_lib
+from secrets import token_hex
 
 from doorman.protocols.customer import CustomerResolver, DoormanCustomerInfo
 from guestman.models import Customer
 from guestman.services import customer as customer_service
+from guestman.utils import normalize_phone
+
+_INFO_FIELDS = ("uuid", "first_name", "last_name", "phone", "email", "is_active")
 
 
 class GuestmanCustomerResolver:
     """Adapter: Guestman implements Doorman's CustomerResolver."""
 
     def get_by_phone(self, phone: str) -> DoormanCustomerInfo | None:
-        c = customer_service.get_by_phone(phone)
-        return self._to_info(c) if c else None
+        phone_normalized = normalize_phone(phone)
+        if not phone_normalized:
+            return None
+        return self._fetch_info(phone=phone_normalized)
 
     def get_by_email(self, email: str) -> DoormanCustomerInfo | None:
-        c = customer_service.get_by_email(email)
-        return self._to_info(c) if c else None
+        return self._fetch_info(email__iexact=email)
 
     def get_by_uuid(self, uuid) -> DoormanCustomerInfo | None:
-        c = customer_service.get_by_uuid(str(uuid))
-        return self._to_info(c) if c else None
+        return self._fetch_info(uuid=str(uuid))
 
     def create_for_phone(self, phone: str) -> DoormanCustomerInfo:
         c = customer_service.create(
-            code=f"WEB-{str(uuid_lib.uuid4())[:8].upper()}",
+            code=f"WEB-{token_hex(4).upper()}",
             first_name="",
             phone=phone,
         )
         return self._to_info(c)
 
+    @staticmethod
+    def _fetch_info(**filters) -> DoormanCustomerInfo | None:
+        """Build the info from a values() row, skipping Customer instantiation."""
+        row = (
+            Customer.objects.filter(is_active=True, **filters)
+            .values(*_INFO_FIELDS)
+            .first()
+        )
+        if row is None:
+            return None
+        return DoormanCustomerInfo(
+            uuid=row["uuid"],
+            name=f"{row['first_name']} {row['last_name']}".strip(),
+            phone=row["phone"],
+            email=row["email"],
+            is_active=row["is_active"],
+        )
+
     @staticmethod
     def _to_info(c: Customer) -> DoormanCustomerInfo:
         return DoormanCustomerInfo(
@@ -1,16 +1,124 @@
 """Omniman OrderHistoryBackend adapter."""
 
+from datetime import datetime
+from functools import lru_cache
+
+from django.db import NotSupportedError
+from django.db.models import Count, F, Func, IntegerField, Max, Min, Sum, Value, Window
+from django.db.models.fields.json import KT, KeyTransform
+from django.db.models.functions import Cast, Coalesce, RowNumber
+
 from guestman.protocols.orders import OrderHistoryBackend, OrderSummary, OrderStats
 
 
+@lru_cache(maxsize=1)
+def _order_model():
+    """Resolve omniman's Order once (None if Omniman is not installed)."""
+    # Late import to avoid circular dependency
+    try:
+        from omniman.models import Order
+    except ImportError:
+        return None
+    return Order
+
+
+class JSONArrayLength(Func):
+    """
+    Length of the JSON array stored under ``key`` (NULL if missing).
+
+    Supported on SQLite, PostgreSQL and MySQL/MariaDB; Oracle is not.
+    """
+
+    function = "JSON_ARRAY_LENGTH"
+    output_field = IntegerField()
+
+    def __init__(self, expression, key, **extra):
+        super().__init__(KeyTransform(key, expression), **extra)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, function="JSONB_ARRAY_LENGTH", **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function="JSON_LENGTH", **extra_context)
+
+    def as_oracle(self, compiler, connection, **extra_context):
+        raise NotSupportedError("JSONArrayLength is not supported on Oracle.")
+
+
+def _summary_fields() -> dict:
+    """values() expressions mapping an Order row onto OrderSummary fields."""
+    return {
+        "order_ref": F("ref"),
+        "channel_code": Coalesce(F("channel__code"), Value("")),
+        "ordered_at": F("created_at"),
+        "total_q": Coalesce(Cast(KT("snapshot__pricing__total_q"), IntegerField()), 0),
+        "items_count": Coalesce(JSONArrayLength("snapshot", "items"), 0),
+    }
+
+
+def _stats_aggregates() -> dict:
+    """Aggregates computing OrderStats fields in the database."""
+    return {
+        "total_orders": Count("id"),
+        "total_spent_q": Coalesce(
+            Sum(Cast(KT("snapshot__pricing__total_q"), IntegerField())), 0
+        ),
+        "first_order_at": Min("created_at"),
+        "last_order_at": Max("created_at"),
+    }
+
+
+def _latest_per_customer(Order, customer_codes: list[str], limit: int):
+    """Orders of the given customers, at most ``limit`` most recent each."""
+    # ROW_NUMBER() per customer keeps the per-customer limit in the DB
+    return (
+        Order.objects.filter(customer_ref__in=customer_codes)
+        .annotate(
+            _rank=Window(
+                RowNumber(),
+                partition_by=F("customer_ref"),
+                order_by=F("created_at").desc(),
+            )
+        )
+        .filter(_rank__lte=limit)
+        .order_by("customer_ref", "_rank")
+    )
+
+
+def _build_stats(row: dict | None) -> OrderStats:
+    """Build OrderStats from an aggregate row (None means no orders)."""
+    row = row or {}
+    total_orders = row.get("total_orders") or 0
+    total_spent = row.get("total_spent_q") or 0
+
+    return OrderStats(
+        total_orders=total_orders,
+        total_spent_q=total_spent,
+        first_order_at=row.get("first_order_at"),
+        last_order_at=row.get("last_order_at"),
+        average_order_q=total_spent // total_orders if total_orders > 0 else 0,
+    )
+
+
 class OmnimanOrderHistoryBackend:
     """
-    Adapter that implements OrderHistoryBackend by querying Omniman.
+    Adapter that implements BulkOrderHistoryBackend and OrderPatternBackend
+    by querying Omniman.
 
     Configuration in settings.py:
         GUESTMAN = {
             "ORDER_HISTORY_BACKEND": "guestman.adapters.omniman_orders.OmnimanOrderHistoryBackend",
         }
+
+    Order summaries count snapshot items with JSONArrayLength, so the
+    Omniman database must be SQLite, PostgreSQL or MySQL/MariaDB.
+
+    Queries filter omniman.Order by customer_ref (ordered by -created_at) and,
+    in the admin, by (handle_type, handle_ref). Omniman should index both:
+        models.Index(fields=["customer_ref", "-created_at"])
+        models.Index(fields=["handle_type", "handle_ref"])
     """
 
     def get_customer_orders(
@@ -19,68 +127,94 @@ class OmnimanOrderHistoryBackend:
         limit: int = 10,
     ) -> list[OrderSummary]:
         """Return last orders for customer from Omniman."""
-        # Late import to avoid circular dependency
-        try:
-            from omniman.models import Order
-        except ImportError:
+        Order = _order_model()
+        if Order is None:
             return []
 
-        orders = (
+        # values() rows map 1:1 onto OrderSummary; no Order instances are built
+        rows = (
             Order.objects.filter(customer_ref=customer_code)
-            .select_related("channel")
-            .order_by("-created_at")[:limit]
+            .order_by("-created_at")
+            .values("status", **_summary_fields())[:limit]
         )
 
-        return [
-            OrderSummary(
-                order_ref=o.ref,
-                channel_code=o.channel.code if o.channel else "",
-                ordered_at=o.created_at,
-                total_q=o.snapshot.get("pricing", {}).get("total_q", 0)
-                if o.snapshot
-                else 0,
-                items_count=len(o.snapshot.get("items", [])) if o.snapshot else 0,
-                status=o.status,
-            )
-            for o in orders
-        ]
+        return [OrderSummary(**row) for row in rows]
 
     def get_order_stats(self, customer_code: str) -> OrderStats:
         """Return aggregated order statistics from Omniman."""
-        try:
-            from omniman.models import Order
-            from django.db.models import Count, Sum
-        except ImportError:
-            return OrderStats(
-                total_orders=0,
-                total_spent_q=0,
-                first_order_at=None,
-                last_order_at=None,
-                average_order_q=0,
-            )
+        Order = _order_model()
+        if Order is None:
+            return _build_stats(None)
+
+        # Single round trip: totals, date range and snapshot sum computed by the DB
+        stats = Order.objects.filter(customer_ref=customer_code).aggregate(
+            **_stats_aggregates()
+        )
+        return _build_stats(stats)
 
-        qs = Order.objects.filter(customer_ref=customer_code)
+    def get_customer_orders_bulk(
+        self,
+        customer_codes: list[str],
+        limit: int = 10,
+    ) -> dict[str, list[OrderSummary]]:
+        """Return last orders for many customers in one query."""
+        orders = {code: [] for code in customer_codes}
+        Order = _order_model()
+        if Order is None:
+            return orders
 
-        # Basic aggregation
-        stats = qs.aggregate(
-            total_orders=Count("id"),
+        rows = _latest_per_customer(Order, customer_codes, limit).values(
+            "customer_ref", "status", **_summary_fields()
         )
+        for row in rows:
+            orders[row.pop("customer_ref")].append(OrderSummary(**row))
+        return orders
 
-        first_order = qs.order_by("created_at").first()
-        last_order = qs.order_by("-created_at").first()
+    def get_order_stats_bulk(self, customer_codes: list[str]) -> dict[str, OrderStats]:
+        """Return aggregated order statistics for many customers in one query."""
+        Order = _order_model()
+        if Order is None:
+            return {code: _build_stats(None) for code in customer_codes}
 
-        total_orders = stats["total_orders"] or 0
+        rows = {
+            row["customer_ref"]: row
+            for row in Order.objects.filter(customer_ref__in=customer_codes)
+            .values("customer_ref")
+            .annotate(**_stats_aggregates())
+            .order_by()
+        }
+        return {code: _build_stats(rows.get(code)) for code in customer_codes}
+
+    def get_customer_order_patterns(
+        self,
+        customer_code: str,
+        limit: int = 10,
+    ) -> list[tuple[datetime, str]]:
+        """Return (ordered_at, channel_code) of last orders for customer."""
+        Order = _order_model()
+        if Order is None:
+            return []
 
-        # Calculate total spent from snapshots
-        total_spent = 0
-        for order in qs.only("snapshot"):
-            if order.snapshot:
-                total_spent += order.snapshot.get("pricing", {}).get("total_q", 0)
+        return list(
+            Order.objects.filter(customer_ref=customer_code)
+            .order_by("-created_at")
+            .values_list("created_at", Coalesce(F("channel__code"), Value("")))[:limit]
+        )
+
+    def get_customer_order_patterns_bulk(
+        self,
+        customer_codes: list[str],
+        limit: int = 10,
+    ) -> dict[str, list[tuple[datetime, str]]]:
+        """Return (ordered_at, channel_code) of last orders for many customers."""
+        patterns = {code: [] for code in customer_codes}
+        Order = _order_model()
+        if Order is None:
+            return patterns
 
-        return OrderStats(
-            total_orders=total_orders,
-            total_spent_q=total_spent,
-            first_order_at=first_order.created_at if first_order else None,
-            last_order_at=last_order.created_at if last_order else None,
-            average_order_q=total_spent // total_orders if total_orders > 0 else 0,
+        rows = _latest_per_customer(Order, customer_codes, limit).values_list(
+            "customer_ref", "created_at", Coalesce(F("channel__code"), Value(""))
         )
+        for customer_ref, ordered_at, channel_code in rows:
+            patterns[customer_ref].append((ordered_at, channel_code))
+        return patterns
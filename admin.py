@@ -6,8 +6,16 @@ Contrib models have their own admin in their respective modules:
 - guestman.contrib.insights.admin: CustomerInsightAdmin
 """
 
+from functools import lru_cache
+
+from django.apps import apps
 from django.contrib import admin
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.lookups import GreaterThan
+from django.urls import get_script_prefix, get_urlconf, reverse
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 
 from guestman.models import (
     Customer,
@@ -18,6 +26,73 @@ from guestman.models import (
 )
 
 
+_VERIFIED_YES = mark_safe('<span style="color: green;">V</span>')
+_VERIFIED_NO = mark_safe('<span style="color: gray;">o</span>')
+
+PROVIDER_UID_SHORT_LENGTH = 20
+
+# Shared with guestman.contrib.admin_unfold (immutable on purpose)
+CUSTOMER_FIELDSETS = (
+    (
+        "Identification",
+        {
+            "fields": (
+                "code",
+                "uuid",
+                "first_name",
+                "last_name",
+                "customer_type",
+                "document",
+            )
+        },
+    ),
+    ("Contact", {"fields": ("email", "phone")}),
+    ("Segmentation", {"fields": ("group", "notes")}),
+    (
+        "System",
+        {
+            "fields": (
+                "is_active",
+                "metadata",
+                "created_at",
+                "updated_at",
+                "created_by",
+                "source_system",
+            ),
+            "classes": ("collapse",),
+        },
+    ),
+)
+
+
+@lru_cache(maxsize=32)
+def _reverse_for(viewname: str, args: tuple, script_prefix: str, urlconf) -> str:
+    return reverse(viewname, args=args, urlconf=urlconf)
+
+
+def reverse_cached(viewname: str, *args) -> str:
+    """reverse(), cached per arguments, script prefix and URLconf of the request."""
+    return _reverse_for(viewname, args, get_script_prefix(), get_urlconf())
+
+
+# Reversed in place of the pk, then replaced by the row's customer id
+_CUSTOMER_PK_PLACEHOLDER = "__customer_pk__"
+
+
+class CustomerLinkMixin:
+    """Adds a customer_link column; the customer change URL is reversed once."""
+
+    def customer_link(self, obj):
+        url = reverse_cached("admin:guestman_customer_change", _CUSTOMER_PK_PLACEHOLDER)
+        return format_html(
+            '<a href="{}">{}</a>',
+            url.replace(_CUSTOMER_PK_PLACEHOLDER, str(obj.customer_id)),
+            obj.customer.code,
+        )
+
+    customer_link.short_description = "Cliente"
+
+
 # ===========================================
 # CustomerGroup Admin
 # ===========================================
@@ -37,10 +112,14 @@ class CustomerGroupAdmin(admin.ModelAdmin):
     search_fields = ["code", "name"]
     ordering = ["-priority", "name"]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_customer_count=Count("customers"))
+
     def customer_count(self, obj):
-        return obj.customers.count()
+        return obj._customer_count
 
     customer_count.short_description = "Customers"
+    customer_count.admin_order_field = "_customer_count"
 
 
 # ===========================================
@@ -72,7 +151,7 @@ class ExternalIdentityInline(admin.TabularInline):
 # Optional inlines from contrib modules
 _optional_inlines = []
 
-try:
+if apps.is_installed("guestman.contrib.consent"):
     from guestman.contrib.consent.models import CommunicationConsent
 
     class CommunicationConsentInline(admin.TabularInline):
@@ -82,10 +161,8 @@ try:
         readonly_fields = ["consented_at", "revoked_at"]
 
     _optional_inlines.append(CommunicationConsentInline)
-except ImportError:
-    pass
 
-try:
+if apps.is_installed("guestman.contrib.timeline"):
     from guestman.contrib.timeline.models import TimelineEvent
 
     class RecentTimelineInline(admin.TabularInline):
@@ -104,8 +181,6 @@ try:
             return False
 
     _optional_inlines.append(RecentTimelineInline)
-except ImportError:
-    pass
 
 
 # ===========================================
@@ -125,6 +200,7 @@ class CustomerAdmin(admin.ModelAdmin):
     ]
     list_filter = ["customer_type", "group", "is_active"]
     search_fields = ["code", "first_name", "last_name", "document", "phone", "email"]
+    list_select_related = ["group"]
     list_editable = ["is_active"]
     readonly_fields = ["uuid", "created_at", "updated_at"]
     inlines = [
@@ -133,37 +209,7 @@ class CustomerAdmin(admin.ModelAdmin):
         ExternalIdentityInline,
     ] + _optional_inlines
 
-    fieldsets = [
-        (
-            "Identification",
-            {
-                "fields": [
-                    "code",
-                    "uuid",
-                    "first_name",
-                    "last_name",
-                    "customer_type",
-                    "document",
-                ]
-            },
-        ),
-        ("Contact", {"fields": ["email", "phone"]}),
-        ("Segmentation", {"fields": ["group", "notes"]}),
-        (
-            "System",
-            {
-                "fields": [
-                    "is_active",
-                    "metadata",
-                    "created_at",
-                    "updated_at",
-                    "created_by",
-                    "source_system",
-                ],
-                "classes": ["collapse"],
-            },
-        ),
-    ]
+    fieldsets = CUSTOMER_FIELDSETS
 
 
 # ===========================================
@@ -191,7 +237,7 @@ class CustomerAddressAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactPoint)
-class ContactPointAdmin(admin.ModelAdmin):
+class ContactPointAdmin(CustomerLinkMixin, admin.ModelAdmin):
     list_display = [
         "value_masked",
         "type",
@@ -202,6 +248,7 @@ class ContactPointAdmin(admin.ModelAdmin):
     ]
     list_filter = ["type", "is_primary", "is_verified", "verification_method"]
     search_fields = ["value_normalized", "customer__code", "customer__first_name"]
+    list_select_related = ["customer"]
     raw_id_fields = ["customer"]
     readonly_fields = ["id", "verified_at", "created_at", "updated_at"]
 
@@ -220,22 +267,8 @@ class ContactPointAdmin(admin.ModelAdmin):
 
     value_masked.short_description = "Value"
 
-    def customer_link(self, obj):
-        from django.urls import reverse
-
-        url = reverse("admin:guestman_customer_change", args=[obj.customer.pk])
-        return format_html(
-            '<a href="{}">{}</a>',
-            url,
-            obj.customer.code,
-        )
-
-    customer_link.short_description = "Customer"
-
     def verified_badge(self, obj):
-        if obj.is_verified:
-            return format_html('<span style="color: green;">V</span>')
-        return format_html('<span style="color: gray;">o</span>')
+        return _VERIFIED_YES if obj.is_verified else _VERIFIED_NO
 
     verified_badge.short_description = "Verified"
 
@@ -246,7 +279,7 @@ class ContactPointAdmin(admin.ModelAdmin):
 
 
 @admin.register(ExternalIdentity)
-class ExternalIdentityAdmin(admin.ModelAdmin):
+class ExternalIdentityAdmin(CustomerLinkMixin, admin.ModelAdmin):
     list_display = [
         "provider",
         "provider_uid_short",
@@ -256,6 +289,7 @@ class ExternalIdentityAdmin(admin.ModelAdmin):
     ]
     list_filter = ["provider", "is_active"]
     search_fields = ["provider_uid", "customer__code", "customer__first_name"]
+    list_select_related = ["customer"]
     raw_id_fields = ["customer"]
     readonly_fields = ["id", "created_at", "updated_at"]
 
@@ -266,21 +300,21 @@ class ExternalIdentityAdmin(admin.ModelAdmin):
         ("Timestamps", {"fields": ["created_at", "updated_at"], "classes": ["collapse"]}),
     ]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _provider_uid_short=Case(
+                When(
+                    GreaterThan(Length("provider_uid"), PROVIDER_UID_SHORT_LENGTH),
+                    then=Concat(
+                        Substr("provider_uid", 1, PROVIDER_UID_SHORT_LENGTH),
+                        Value("..."),
+                    ),
+                ),
+                default=F("provider_uid"),
+            )
+        )
+
     def provider_uid_short(self, obj):
-        if len(obj.provider_uid) > 20:
-            return obj.provider_uid[:20] + "..."
-        return obj.provider_uid
+        return obj._provider_uid_short
 
     provider_uid_short.short_description = "Provider UID"
-
-    def customer_link(self, obj):
-        from django.urls import reverse
-
-        url = reverse("admin:guestman_customer_change", args=[obj.customer.pk])
-        return format_html(
-            '<a href="{}">{}</a>',
-            url,
-            obj.customer.code,
-        )
-
-    customer_link.short_description = "Customer"
@@ -9,9 +9,11 @@ Usage in settings.py:
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 from django.conf import settings
+from django.core.signals import setting_changed
 
 
 @dataclass
@@ -34,11 +36,24 @@ def get_guestman_settings() -> GuestmanSettings:
     return GuestmanSettings(**user_settings)
 
 
+@lru_cache(maxsize=1)
+def _cached_settings() -> GuestmanSettings:
+    return get_guestman_settings()
+
+
+def _reload_settings(*, setting, **kwargs):
+    if setting == "GUESTMAN":
+        _cached_settings.cache_clear()
+
+
+setting_changed.connect(_reload_settings)
+
+
 class _LazySettings:
-    """Lazy proxy that re-reads settings on every attribute access."""
+    """Lazy proxy over the cached settings (reloaded when GUESTMAN changes)."""
 
     def __getattr__(self, name):
-        return getattr(get_guestman_settings(), name)
+        return getattr(_cached_settings(), name)
 
 
 guestman_settings = _LazySettings()
@@ -9,12 +9,16 @@ the Unfold versions.
 """
 
 from django.contrib import admin
-from django.urls import reverse
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
 from django.utils.html import format_html
 from unfold.decorators import display
 
 from shopman_commons.contrib.admin_unfold.badges import unfold_badge
 from shopman_commons.contrib.admin_unfold.base import BaseModelAdmin, BaseTabularInline
+from guestman.admin import CUSTOMER_FIELDSETS, reverse_cached
 from guestman.models import (
     Customer,
     CustomerGroup,
@@ -22,6 +26,27 @@ from guestman.models import (
 )
 
 
+ORDERS_COUNT_CACHE_TTL = 60
+
+
+def _orders_count_cache_key(customer_code: str) -> str:
+    return f"guestman:orders_count:{customer_code}"
+
+
+def _invalidate_orders_count(sender, instance, **kwargs):
+    if getattr(instance, "handle_type", None) == "customer" and instance.handle_ref:
+        cache.delete(_orders_count_cache_key(instance.handle_ref))
+
+
+try:
+    from omniman.models import Order as _Order
+
+    post_save.connect(_invalidate_orders_count, sender=_Order)
+    post_delete.connect(_invalidate_orders_count, sender=_Order)
+except ImportError:
+    pass
+
+
 # Unregister basic admins
 for model in [Customer, CustomerGroup, CustomerAddress]:
     try:
@@ -53,9 +78,12 @@ class CustomerGroupAdmin(BaseModelAdmin):
     def is_default_badge(self, obj):
         return obj.is_default
 
-    @display(description="Customers")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_customer_count=Count("customers"))
+
+    @display(description="Customers", ordering="_customer_count")
     def customer_count(self, obj):
-        return obj.customers.count()
+        return obj._customer_count
 
 
 # =============================================================================
@@ -83,48 +111,38 @@ class CustomerAdmin(BaseModelAdmin):
     ]
     list_filter = ["customer_type", "group", "is_active"]
     search_fields = ["code", "first_name", "last_name", "document", "phone", "email"]
+    list_select_related = ["group"]
     readonly_fields = ["uuid", "created_at", "updated_at"]
     inlines = [CustomerAddressInline]
 
-    fieldsets = [
-        (
-            "Identification",
-            {
-                "fields": [
-                    "code",
-                    "uuid",
-                    "first_name",
-                    "last_name",
-                    "customer_type",
-                    "document",
-                ]
-            },
-        ),
-        ("Contact", {"fields": ["email", "phone"]}),
-        ("Segmentation", {"fields": ["group", "notes"]}),
-        (
-            "System",
-            {
-                "fields": [
-                    "is_active",
-                    "metadata",
-                    "created_at",
-                    "updated_at",
-                    "created_by",
-                    "source_system",
-                ],
-                "classes": ["collapse"],
-            },
-        ),
-    ]
+    fieldsets = CUSTOMER_FIELDSETS
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        try:
+            from omniman.models import Order
+        except ImportError:
+            return qs
+
+        orders_count = (
+            Order.objects.filter(handle_type="customer", handle_ref=OuterRef("code"))
+            .order_by()
+            .values("handle_ref")
+            .annotate(c=Count("*"))
+            .values("c")
+        )
+        return qs.annotate(
+            _orders_count=Coalesce(Subquery(orders_count, output_field=IntegerField()), 0)
+        )
+
+    CUSTOMER_TYPE_COLORS = {
+        "individual": "blue",
+        "company": "green",
+    }
 
     @display(description="Type")
     def customer_type_badge(self, obj):
-        colors = {
-            "individual": "blue",
-            "company": "green",
-        }
-        color = colors.get(obj.customer_type, "base")
+        color = self.CUSTOMER_TYPE_COLORS.get(obj.customer_type, "base")
         return unfold_badge(obj.get_customer_type_display(), color)
 
     @display(description="Active", boolean=True)
@@ -137,13 +155,20 @@ class CustomerAdmin(BaseModelAdmin):
         try:
             from omniman.models import Order
 
-            count = Order.objects.filter(
-                handle_type="customer", handle_ref=obj.code
-            ).count()
+            # Annotated by get_queryset; cached per customer otherwise
+            count = getattr(obj, "_orders_count", None)
+            if count is None:
+                count = cache.get_or_set(
+                    _orders_count_cache_key(obj.code),
+                    lambda: Order.objects.filter(
+                        handle_type="customer", handle_ref=obj.code
+                    ).count(),
+                    ORDERS_COUNT_CACHE_TTL,
+                )
             if count == 0:
                 return "-"
             url = (
-                reverse("admin:omniman_order_changelist")
+                reverse_cached("admin:omniman_order_changelist")
                 + f"?handle_type=customer&handle_ref={obj.code}"
             )
             return format_html(
@@ -175,14 +200,15 @@ class CustomerAddressAdmin(BaseModelAdmin):
     search_fields = ["customer__code", "customer__first_name", "formatted_address"]
     raw_id_fields = ["customer"]
 
+    LABEL_COLORS = {
+        "home": "green",
+        "work": "blue",
+        "other": "base",
+    }
+
     @display(description="Label")
     def label_badge(self, obj):
-        colors = {
-            "home": "green",
-            "work": "blue",
-            "other": "base",
-        }
-        color = colors.get(obj.label, "base")
+        color = self.LABEL_COLORS.get(obj.label, "base")
         return unfold_badge(obj.get_label_display(), color)
 
     @display(description="Default", boolean=True)
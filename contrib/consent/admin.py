@@ -3,11 +3,12 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
+from guestman.admin import CustomerLinkMixin
 from guestman.contrib.consent.models import CommunicationConsent
 
 
 @admin.register(CommunicationConsent)
-class CommunicationConsentAdmin(admin.ModelAdmin):
+class CommunicationConsentAdmin(CustomerLinkMixin, admin.ModelAdmin):
     list_display = [
         "customer_link",
         "channel",
@@ -20,16 +21,19 @@ class CommunicationConsentAdmin(admin.ModelAdmin):
     list_filter = ["channel", "status", "legal_basis"]
     search_fields = ["customer__code", "customer__first_name"]
     raw_id_fields = ["customer"]
+    list_select_related = ["customer"]
     readonly_fields = ["created_at", "updated_at"]
 
+    # status -> (background, text) colors
+    STATUS_COLORS = {
+        "opted_in": ("#28a745", "#fff"),
+        "opted_out": ("#dc3545", "#fff"),
+        "pending": ("#ffc107", "#000"),
+    }
+    DEFAULT_STATUS_COLORS = ("#6c757d", "#fff")
+
     def status_badge(self, obj):
-        colors = {
-            "opted_in": "#28a745",
-            "opted_out": "#dc3545",
-            "pending": "#ffc107",
-        }
-        color = colors.get(obj.status, "#6c757d")
-        text_color = "#000" if obj.status == "pending" else "#fff"
+        color, text_color = self.STATUS_COLORS.get(obj.status, self.DEFAULT_STATUS_COLORS)
         return format_html(
             '<span style="background:{}; color:{}; padding:2px 8px; '
             'border-radius:3px; font-size:11px;">{}</span>',
@@ -39,11 +43,3 @@ class CommunicationConsentAdmin(admin.ModelAdmin):
         )
 
     status_badge.short_description = "Status"
-
-    def customer_link(self, obj):
-        from django.urls import reverse
-
-        url = reverse("admin:guestman_customer_change", args=[obj.customer.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.customer.code)
-
-    customer_link.short_description = "Cliente"
@@ -8,3 +8,19 @@ class ConsentConfig(AppConfig):
     name = "guestman.contrib.consent"
     label = "guestman_consent"
     verbose_name = _("Consentimento de Comunicação")
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from guestman.contrib.consent.models import CommunicationConsent
+        from guestman.contrib.consent.service import (
+            forget_customer_consent_cache,
+            invalidate_consent_cache,
+            invalidate_customer_consent_cache,
+        )
+        from guestman.models import Customer
+
+        post_save.connect(invalidate_consent_cache, sender=CommunicationConsent)
+        post_delete.connect(invalidate_consent_cache, sender=CommunicationConsent)
+        post_save.connect(invalidate_customer_consent_cache, sender=Customer)
+        post_delete.connect(forget_customer_consent_cache, sender=Customer)
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guestman_consent', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='communicationconsent',
+            index=models.Index(condition=models.Q(('status', 'opted_in')), fields=['channel', 'customer'], name='guestman_consent_opted_in_idx'),
+        ),
+    ]
@@ -118,6 +118,14 @@ class CommunicationConsent(models.Model):
                 name="guestman_unique_consent_per_channel",
             ),
         ]
+        indexes = [
+            # Campaign audiences: opted-in customers per channel
+            models.Index(
+                fields=["channel", "customer"],
+                condition=models.Q(status=ConsentStatus.OPTED_IN),
+                name="guestman_consent_opted_in_idx",
+            ),
+        ]
         ordering = ["channel"]
 
     def __str__(self):
@@ -1,7 +1,9 @@
 """Consent service — LGPD opt-in/opt-out management."""
 
 import logging
+from collections.abc import Iterator
 
+from django.core.cache import cache
 from django.utils import timezone
 
 from guestman.contrib.consent.models import (
@@ -9,9 +11,62 @@ from guestman.contrib.consent.models import (
     ConsentStatus,
 )
 from guestman.models import Customer
+from guestman.services import customer as customer_service
 
 logger = logging.getLogger(__name__)
 
+CONSENT_CACHE_TTL = 3600
+OPTED_IN_CHANNELS_CACHE_TTL = 600
+
+
+# Consent entries are keyed by customer id; the code -> id entry only
+# exists for active customers and is dropped when code or is_active change.
+def _customer_id_cache_key(customer_code: str) -> str:
+    return f"v2:consent:customer:{customer_code}"
+
+
+def _consent_cache_key(customer_id: int, channel: str) -> str:
+    return f"v2:consent:{customer_id}:{channel}"
+
+
+def _channels_cache_key(customer_id: int) -> str:
+    return f"v2:consent:channels:{customer_id}"
+
+
+def _active_customer_id(customer_code: str) -> int | None:
+    """Id of the active customer with this code (cached), None otherwise."""
+    key = _customer_id_cache_key(customer_code)
+    customer_id = cache.get(key)
+    if customer_id is None:
+        customer_id = customer_service.get_id(customer_code)
+        if customer_id is not None:
+            cache.set(key, customer_id, CONSENT_CACHE_TTL)
+    return customer_id
+
+
+def invalidate_consent_cache(sender, instance, **kwargs):
+    """Drop cached consent lookups when a consent row changes."""
+    cache.delete_many(
+        [
+            _consent_cache_key(instance.customer_id, instance.channel),
+            _channels_cache_key(instance.customer_id),
+        ]
+    )
+
+
+def invalidate_customer_consent_cache(sender, instance, created=False, **kwargs):
+    """Drop the code -> id entry when a customer's code or is_active changed (post_save)."""
+    if created:
+        return
+    codes = instance.stale_cache_codes()
+    if codes:
+        cache.delete_many([_customer_id_cache_key(code) for code in codes])
+
+
+def forget_customer_consent_cache(sender, instance, **kwargs):
+    """Drop the code -> id entry of a deleted customer (post_delete)."""
+    cache.delete(_customer_id_cache_key(instance.code))
+
 
 class ConsentService:
     """
@@ -45,10 +100,14 @@ class ConsentService:
         Raises:
             Customer.DoesNotExist: If customer not found
         """
-        customer = Customer.objects.get(code=customer_code, is_active=True)
+        customer_id = customer_service.get_id(customer_code)
+        if customer_id is None:
+            raise Customer.DoesNotExist(f"Customer {customer_code} not found")
 
+        # update_or_create returns the stored row (created_at, pk) and fires
+        # post_save, which invalidates the consent caches
         consent, _ = CommunicationConsent.objects.update_or_create(
-            customer=customer,
+            customer_id=customer_id,
             channel=channel,
             defaults={
                 "status": ConsentStatus.OPTED_IN,
@@ -83,10 +142,12 @@ class ConsentService:
         Raises:
             Customer.DoesNotExist: If customer not found
         """
-        customer = Customer.objects.get(code=customer_code, is_active=True)
+        customer_id = customer_service.get_id(customer_code)
+        if customer_id is None:
+            raise Customer.DoesNotExist(f"Customer {customer_code} not found")
 
         consent, _ = CommunicationConsent.objects.update_or_create(
-            customer=customer,
+            customer_id=customer_id,
             channel=channel,
             defaults={
                 "status": ConsentStatus.OPTED_OUT,
@@ -110,15 +171,43 @@ class ConsentService:
         Returns:
             True only if status is opted_in
         """
-        try:
-            consent = CommunicationConsent.objects.get(
-                customer__code=customer_code,
+        customer_id = _active_customer_id(customer_code)
+        if customer_id is None:
+            return False
+
+        key = _consent_cache_key(customer_id, channel)
+        allowed = cache.get(key)
+        if allowed is None:
+            allowed = CommunicationConsent.objects.filter(
+                customer_id=customer_id,
+                channel=channel,
+                status=ConsentStatus.OPTED_IN,
+            ).exists()
+            cache.set(key, allowed, CONSENT_CACHE_TTL)
+        return allowed
+
+    @classmethod
+    def has_consent_bulk(cls, customer_codes: list[str], channel: str) -> set[str]:
+        """
+        Check consent for many customers in a single query.
+
+        Use instead of calling has_consent() in a loop (e.g. campaign sends).
+
+        Args:
+            customer_codes: Customer codes to check
+            channel: Channel to check
+
+        Returns:
+            Set of codes whose status is opted_in
+        """
+        return set(
+            CommunicationConsent.objects.filter(
+                customer__code__in=customer_codes,
                 customer__is_active=True,
                 channel=channel,
-            )
-            return consent.status == ConsentStatus.OPTED_IN
-        except CommunicationConsent.DoesNotExist:
-            return False
+                status=ConsentStatus.OPTED_IN,
+            ).values_list("customer__code", flat=True)
+        )
 
     @classmethod
     def get_consents(cls, customer_code: str) -> list[CommunicationConsent]:
@@ -133,13 +222,21 @@ class ConsentService:
     @classmethod
     def get_opted_in_channels(cls, customer_code: str) -> list[str]:
         """Get list of channels where customer has active consent."""
-        return list(
-            CommunicationConsent.objects.filter(
-                customer__code=customer_code,
-                customer__is_active=True,
-                status=ConsentStatus.OPTED_IN,
-            ).values_list("channel", flat=True)
-        )
+        customer_id = _active_customer_id(customer_code)
+        if customer_id is None:
+            return []
+
+        key = _channels_cache_key(customer_id)
+        channels = cache.get(key)
+        if channels is None:
+            channels = tuple(
+                CommunicationConsent.objects.filter(
+                    customer_id=customer_id,
+                    status=ConsentStatus.OPTED_IN,
+                ).values_list("channel", flat=True)
+            )
+            cache.set(key, channels, OPTED_IN_CHANNELS_CACHE_TTL)
+        return list(channels)
 
     @classmethod
     def get_marketable_customers(cls, channel: str) -> list[str]:
@@ -154,10 +251,31 @@ class ConsentService:
         Returns:
             List of customer codes
         """
-        return list(
-            CommunicationConsent.objects.filter(
-                channel=channel,
-                status=ConsentStatus.OPTED_IN,
-                customer__is_active=True,
-            ).values_list("customer__code", flat=True)
-        )
+        return list(cls._marketable_codes(channel))
+
+    @classmethod
+    def get_marketable_customers_iter(
+        cls, channel: str, chunk_size: int = 2000
+    ) -> Iterator[str]:
+        """
+        Stream customer codes with active consent for a channel.
+
+        Same audience as get_marketable_customers(), fetched in chunks so
+        large campaigns don't hold the whole list in memory.
+
+        Args:
+            channel: Channel to filter by
+            chunk_size: Rows fetched per database round trip
+
+        Returns:
+            Iterator of customer codes
+        """
+        return cls._marketable_codes(channel).iterator(chunk_size=chunk_size)
+
+    @classmethod
+    def _marketable_codes(cls, channel: str):
+        return CommunicationConsent.objects.filter(
+            channel=channel,
+            status=ConsentStatus.OPTED_IN,
+            customer__is_active=True,
+        ).values_list("customer__code", flat=True)
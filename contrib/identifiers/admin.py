@@ -19,3 +19,4 @@ class CustomerIdentifierAdmin(admin.ModelAdmin):
     search_fields = ["customer__code", "customer__first_name", "identifier_value"]
     readonly_fields = ["created_at"]
     raw_id_fields = ["customer"]
+    list_select_related = ["customer"]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guestman_identifiers', '0002_alter_customeridentifier_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customeridentifier',
+            index=models.Index(fields=['customer', 'identifier_type', '-is_primary'], name='guestman_id_custome_c55441_idx'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guestman_identifiers', '0003_customeridentifier_customer_type_primary_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='customeridentifier',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('identifier_value'), condition=models.Q(('identifier_type', 'email')), name='guestman_unique_identifier_email_ci'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guestman_identifiers', '0004_customeridentifier_unique_identifier_email_ci'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customeridentifier',
+            name='guestman_id_identif_78db49_idx',
+        ),
+        migrations.AddIndex(
+            model_name='customeridentifier',
+            index=models.Index(fields=['identifier_type', 'identifier_value'], include=['customer'], name='guestman_identifier_cov_idx'),
+        ),
+    ]
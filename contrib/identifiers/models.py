@@ -1,10 +1,13 @@
 """CustomerIdentifier model for multi-channel deduplication."""
 
-import re
+from functools import partial
 
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+from guestman.utils import normalize_phone
+
 
 class IdentifierType(models.TextChoices):
     """Supported identifier types."""
@@ -18,6 +21,22 @@ class IdentifierType(models.TextChoices):
     MANYCHAT = "manychat", _("Manychat ID")
 
 
+# Value normalizer per identifier type (types not listed are kept as-is)
+IDENTIFIER_NORMALIZERS = {
+    IdentifierType.PHONE: normalize_phone,
+    IdentifierType.WHATSAPP: normalize_phone,
+    IdentifierType.EMAIL: lambda value: value.lower().strip(),
+    IdentifierType.INSTAGRAM: partial(normalize_phone, contact_type="instagram"),
+}
+
+
+def normalize_identifier_value(identifier_type: str, value) -> str:
+    """Value as CustomerIdentifier.save() stores it (unlisted types kept as-is)."""
+    value = str(value)
+    normalize = IDENTIFIER_NORMALIZERS.get(identifier_type)
+    return normalize(value) if normalize is not None else value
+
+
 class CustomerIdentifier(models.Model):
     """
     Unique customer identifier.
@@ -68,9 +87,22 @@ class CustomerIdentifier(models.Model):
                 fields=["identifier_type", "identifier_value"],
                 name="guestman_unique_identifier",
             ),
+            # Emails are lowercased in save(); enforce it for rows written
+            # around the model (shell, data migrations, bulk updates) too
+            models.UniqueConstraint(
+                Lower("identifier_value"),
+                condition=models.Q(identifier_type=IdentifierType.EMAIL),
+                name="guestman_unique_identifier_email_ci",
+            ),
         ]
         indexes = [
-            models.Index(fields=["identifier_type", "identifier_value"]),
+            # Covers customer_id so lookups by (type, value) skip the heap (PostgreSQL)
+            models.Index(
+                fields=["identifier_type", "identifier_value"],
+                include=["customer"],
+                name="guestman_identifier_cov_idx",
+            ),
+            models.Index(fields=["customer", "identifier_type", "-is_primary"]),
         ]
 
     def __str__(self):
@@ -78,21 +110,17 @@ class CustomerIdentifier(models.Model):
 
     def save(self, *args, **kwargs):
         # Normalize value using centralized function
-        from guestman.utils import normalize_phone
-
-        if self.identifier_type in (IdentifierType.PHONE, IdentifierType.WHATSAPP):
-            self.identifier_value = normalize_phone(self.identifier_value)
-        elif self.identifier_type == IdentifierType.EMAIL:
-            self.identifier_value = self.identifier_value.lower().strip()
-        elif self.identifier_type == IdentifierType.INSTAGRAM:
-            self.identifier_value = normalize_phone(
-                self.identifier_value, contact_type="instagram"
-            )
-
-        # Ensure only one primary per type/customer
-        if self.is_primary:
+        self.identifier_value = normalize_identifier_value(
+            self.identifier_type, self.identifier_value
+        )
+
+        # Ensure only one primary per type/customer (unless this save
+        # explicitly leaves is_primary untouched)
+        update_fields = kwargs.get("update_fields")
+        writes_primary = update_fields is None or "is_primary" in update_fields
+        if self.is_primary and writes_primary:
             CustomerIdentifier.objects.filter(
-                customer=self.customer,
+                customer_id=self.customer_id,
                 identifier_type=self.identifier_type,
                 is_primary=True,
             ).exclude(pk=self.pk).update(is_primary=False)
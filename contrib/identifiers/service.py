@@ -1,8 +1,16 @@
 """Identifier service for lookup and management."""
 
+import hashlib
+
 from django.db import transaction
+from django.db.models import Case, When
 
-from guestman.contrib.identifiers.models import CustomerIdentifier, IdentifierType
+from guestman.contrib.identifiers.models import (
+    IDENTIFIER_NORMALIZERS,
+    CustomerIdentifier,
+    IdentifierType,
+    normalize_identifier_value,
+)
 from guestman.models import Customer
 
 
@@ -34,10 +42,12 @@ class IdentifierService:
         normalized = cls._normalize_value(identifier_type, identifier_value)
 
         # 1. CustomerIdentifier table (canonical source for multi-channel)
+        # Only the customer is used, so skip the identifier's own columns
         try:
-            ident = CustomerIdentifier.objects.select_related("customer").get(
-                identifier_type=identifier_type,
-                identifier_value=normalized,
+            ident = (
+                CustomerIdentifier.objects.select_related("customer")
+                .only("customer")
+                .get(identifier_type=identifier_type, identifier_value=normalized)
             )
             if ident.customer.is_active:
                 return ident.customer
@@ -53,15 +63,19 @@ class IdentifierService:
             elif identifier_type == IdentifierType.PHONE:
                 # Phone is stored in E.164 format (with country code)
                 # Legacy records without country code are handled by trying both
-                customer = Customer.objects.filter(
-                    phone=normalized, is_active=True
-                ).first()
-                if not customer and normalized.startswith("55"):
-                    # Try legacy format (without country code)
-                    customer = Customer.objects.filter(
-                        phone=normalized[2:], is_active=True
-                    ).first()
-                return customer
+                qs = Customer.objects.filter(is_active=True)
+                if not normalized.startswith("55"):
+                    return qs.filter(phone=normalized).first()
+                # One query for both formats; the E.164 match wins
+                return (
+                    qs.filter(phone__in=[normalized, normalized[2:]])
+                    .order_by(
+                        Case(When(phone=normalized, then=0), default=1),
+                        "first_name",
+                        "last_name",
+                    )
+                    .first()
+                )
 
         return None
 
@@ -91,7 +105,20 @@ class IdentifierService:
             Customer.DoesNotExist: If customer not found
         """
         customer = Customer.objects.get(code=customer_code, is_active=True)
+        return cls._add_identifier_for_customer(
+            customer, identifier_type, identifier_value, is_primary, source_system
+        )
 
+    @classmethod
+    def _add_identifier_for_customer(
+        cls,
+        customer: Customer,
+        identifier_type: str,
+        identifier_value: str,
+        is_primary: bool = False,
+        source_system: str = "",
+    ) -> CustomerIdentifier:
+        """Add identifier to an already loaded customer."""
         return CustomerIdentifier.objects.create(
             customer=customer,
             identifier_type=identifier_type,
@@ -100,6 +127,70 @@ class IdentifierService:
             source_system=source_system,
         )
 
+    @classmethod
+    def bulk_add_identifiers(cls, rows: list[dict], batch_size: int = 1000) -> int:
+        """
+        Add many identifiers at once (imports, ETL).
+
+        Values are normalized in Python and written with multi-row INSERTs,
+        bypassing CustomerIdentifier.save(). Rows whose customer is missing
+        or inactive are skipped, as are identifiers that already exist.
+        A row is only made primary if its customer has no primary of that
+        type yet (first one in the batch wins).
+
+        Args:
+            rows: Dicts with customer_code, identifier_type, identifier_value
+                and optional is_primary, source_system
+            batch_size: Rows per INSERT statement
+
+        Returns:
+            Number of identifiers submitted for insert
+        """
+        codes = {row["customer_code"] for row in rows}
+        customer_ids = dict(
+            Customer.objects.filter(code__in=codes, is_active=True).values_list(
+                "code", "id"
+            )
+        )
+        taken_primaries = set(
+            CustomerIdentifier.objects.filter(
+                customer_id__in=customer_ids.values(), is_primary=True
+            ).values_list("customer_id", "identifier_type")
+        )
+
+        objs = []
+        seen = set()
+        for row in rows:
+            customer_id = customer_ids.get(row["customer_code"])
+            if customer_id is None:
+                continue
+            identifier_type = row["identifier_type"]
+            # Stored as save() would: no stripping for unlisted types
+            value = normalize_identifier_value(identifier_type, row["identifier_value"])
+            if (identifier_type, value) in seen:
+                continue
+            seen.add((identifier_type, value))
+
+            is_primary = False
+            if row.get("is_primary") and (customer_id, identifier_type) not in taken_primaries:
+                taken_primaries.add((customer_id, identifier_type))
+                is_primary = True
+
+            objs.append(
+                CustomerIdentifier(
+                    customer_id=customer_id,
+                    identifier_type=identifier_type,
+                    identifier_value=value,
+                    is_primary=is_primary,
+                    source_system=row.get("source_system", ""),
+                )
+            )
+
+        CustomerIdentifier.objects.bulk_create(
+            objs, batch_size=batch_size, ignore_conflicts=True
+        )
+        return len(objs)
+
     @classmethod
     def find_or_create_customer(
         cls,
@@ -131,8 +222,8 @@ class IdentifierService:
 
         with transaction.atomic():
             customer = Customer.objects.create(**defaults)
-            cls.add_identifier(
-                customer.code,
+            cls._add_identifier_for_customer(
+                customer,
                 identifier_type,
                 identifier_value,
                 is_primary=True,
@@ -153,15 +244,7 @@ class IdentifierService:
     @classmethod
     def _normalize_value(cls, identifier_type: str, value: str) -> str:
         """Normalize identifier value based on type."""
-        from guestman.utils import normalize_phone
-
-        if identifier_type in (IdentifierType.PHONE, IdentifierType.WHATSAPP):
-            return normalize_phone(value)
-        elif identifier_type == IdentifierType.EMAIL:
-            return value.lower().strip()
-        elif identifier_type == IdentifierType.INSTAGRAM:
-            return normalize_phone(value, contact_type="instagram")
-        return value.strip()
+        return IDENTIFIER_NORMALIZERS.get(identifier_type, str.strip)(str(value))
 
     @classmethod
     def _generate_code_from_identifier(
@@ -170,9 +253,7 @@ class IdentifierService:
         identifier_value: str,
     ) -> str:
         """Generate customer code from identifier."""
-        import hashlib
-
-        # Create a short hash
+        # Create a short hash (4-byte digest = 8 hex chars)
         hash_input = f"{identifier_type}:{identifier_value}"
-        hash_value = hashlib.md5(hash_input.encode()).hexdigest()[:8].upper()
+        hash_value = hashlib.blake2b(hash_input.encode(), digest_size=4).hexdigest().upper()
         return f"CUST-{hash_value}"
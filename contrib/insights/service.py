@@ -1,22 +1,91 @@
 """Insight service for calculation and retrieval."""
 
 import logging
-from datetime import datetime, timezone
+from bisect import bisect_left, bisect_right
+from datetime import UTC, datetime
 from decimal import Decimal
 from collections import Counter
+from functools import lru_cache
+from itertools import islice
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
 from django.utils.module_loading import import_string
 
 from guestman.contrib.insights.models import CustomerInsight
 from guestman.models import Customer
-from guestman.protocols.orders import OrderHistoryBackend
+from guestman.protocols.orders import (
+    BulkOrderHistoryBackend,
+    OrderHistoryBackend,
+    OrderStats,
+    OrderPatternBackend,
+    OrderSummary,
+)
 
 logger = logging.getLogger(__name__)
 
-
+# Recent orders considered for pattern analysis (weekday, hour, channel)
+RECENT_ORDERS_LIMIT = 50
+
+# RFM score thresholds (sorted ascending, searched with bisect)
+# Recency: <=7 days -> 5, <=30 -> 4, <=90 -> 3, <=180 -> 2, older -> 1
+_RECENCY_MAX_DAYS = (7, 30, 90, 180)
+_RECENCY_SCORES = (5, 4, 3, 2, 1)
+# Frequency: >=2 orders -> 2, >=5 -> 3, >=10 -> 4, >=20 -> 5
+_FREQUENCY_MIN_ORDERS = (2, 5, 10, 20)
+# Monetary (adjust to business): R$ 500 -> 2, R$ 2.000 -> 3, R$ 5.000 -> 4, R$ 10.000 -> 5
+_MONETARY_MIN_Q = (50000, 200000, 500000, 1000000)
+
+_ONE_DECIMAL = Decimal("0.1")
+
+# Metrics written when no OrderHistoryBackend is configured
+_RESET_FIELDS = {"total_orders": 0, "total_spent_q": 0, "average_ticket_q": 0}
+
+# Churn risk levels (Decimal constants, built once)
+_CHURN_0_1 = Decimal("0.1")
+_CHURN_0_3 = Decimal("0.3")
+_CHURN_0_4 = Decimal("0.4")
+_CHURN_0_5 = Decimal("0.5")
+_CHURN_0_7 = Decimal("0.7")
+_CHURN_0_8 = Decimal("0.8")
+_CHURN_0_9 = Decimal("0.9")
+
+
+def _rfm_segment(r: int, f: int, m: int) -> str:
+    """RFM segment rules (see _RFM_SEGMENTS for the precomputed table)."""
+    score = r + f + m
+
+    if score >= 13:
+        return "champion"
+    if r >= 4 and f >= 3:
+        return "loyal_customer"
+    if r >= 4 and f <= 2:
+        return "recent_customer"
+    if r <= 2 and f >= 3:
+        return "at_risk"
+    if r <= 2 and f <= 2:
+        return "lost"
+    return "regular"
+
+
+# Every (r, f, m) score combination (1-5 each) resolved once at import
+_RFM_SEGMENTS = {
+    (r, f, m): _rfm_segment(r, f, m)
+    for r in range(1, 6)
+    for f in range(1, 6)
+    for m in range(1, 6)
+}
+
+
+def _patterns_from_orders(orders: list[OrderSummary]) -> list[tuple[datetime, str]]:
+    """(ordered_at, channel_code) pairs for backends without OrderPatternBackend."""
+    return [(o.ordered_at, o.channel_code) for o in orders]
+
+
+@lru_cache(maxsize=1)
 def _get_order_backend() -> OrderHistoryBackend | None:
-    """Get configured OrderHistoryBackend."""
+    """Get configured OrderHistoryBackend (instantiated once per process)."""
     guestman_settings = getattr(settings, "GUESTMAN", {})
     backend_path = guestman_settings.get("ORDER_HISTORY_BACKEND")
     if backend_path:
@@ -25,6 +94,14 @@ def _get_order_backend() -> OrderHistoryBackend | None:
     return None
 
 
+def _reset_order_backend(*, setting, **kwargs):
+    if setting == "GUESTMAN":
+        _get_order_backend.cache_clear()
+
+
+setting_changed.connect(_reset_order_backend)
+
+
 class InsightService:
     """
     Service for customer insight operations.
@@ -52,12 +129,16 @@ class InsightService:
             return None
 
     @classmethod
-    def recalculate(cls, customer_code: str) -> CustomerInsight:
+    def recalculate(cls, customer_code: str, *, now: datetime | None = None) -> CustomerInsight:
         """
         Recalculate insights for customer using OrderHistoryBackend.
 
+        Only changed fields are written; when nothing changed the row (and
+        its calculated_at) is left untouched.
+
         Args:
             customer_code: Customer code
+            now: Reference time for recency (defaults to current time)
 
         Returns:
             Updated CustomerInsight
@@ -70,110 +151,264 @@ class InsightService:
         # Get or create insight
         insight, _ = CustomerInsight.objects.get_or_create(customer=customer)
 
-        # Get order backend
-        backend = _get_order_backend()
-        if not backend:
-            # No backend configured - reset metrics
-            insight.total_orders = 0
-            insight.total_spent_q = 0
-            insight.average_ticket_q = 0
-            insight.save()
-            return insight
+        fields = cls._insight_fields(_get_order_backend(), customer_code, now=now)
+        changed = cls._apply_fields(insight, fields)
+        if changed:
+            insight.save(update_fields=[*changed, "calculated_at"])
 
-        # Get stats from backend
-        stats = backend.get_order_stats(customer_code)
-
-        # Update basic metrics
-        insight.total_orders = stats.total_orders
-        insight.total_spent_q = stats.total_spent_q
-        insight.average_ticket_q = stats.average_order_q
-        insight.first_order_at = stats.first_order_at
-        insight.last_order_at = stats.last_order_at
-
-        # Calculate days since last order
-        if stats.last_order_at:
-            delta = datetime.now(timezone.utc) - stats.last_order_at
-            insight.days_since_last_order = delta.days
-        else:
-            insight.days_since_last_order = None
-
-        # Calculate average days between orders
-        if stats.total_orders > 1 and stats.first_order_at and stats.last_order_at:
-            total_days = (stats.last_order_at - stats.first_order_at).days
-            insight.average_days_between_orders = Decimal(
-                total_days / (stats.total_orders - 1)
-            )
-        else:
-            insight.average_days_between_orders = None
+        return insight
 
-        # Get recent orders for pattern analysis
-        orders = backend.get_customer_orders(customer_code, limit=50)
+    @classmethod
+    def recalculate_all(cls, batch_size: int = 500) -> int:
+        """
+        Recalculate insights for all active customers.
 
-        if orders:
-            # Preferred weekday (0=Monday, 6=Sunday)
-            weekdays = [o.ordered_at.weekday() for o in orders]
-            insight.preferred_weekday = Counter(weekdays).most_common(1)[0][0]
+        Streams customers with iterator() and persists each batch with
+        bulk_update/bulk_create instead of one save() per customer. When the
+        backend implements BulkOrderHistoryBackend, order data is also
+        fetched once per batch.
 
-            # Preferred hour
-            hours = [o.ordered_at.hour for o in orders]
-            insight.preferred_hour = Counter(hours).most_common(1)[0][0]
+        Args:
+            batch_size: Customers loaded and written per batch
 
-            # Channels used
-            channels = list(set(o.channel_code for o in orders))
-            insight.channels_used = channels
+        Returns:
+            Number of customers processed
+        """
+        backend = _get_order_backend()
+        if not backend:
+            return cls._reset_all(batch_size)
 
-            # Preferred channel
-            channel_counts = Counter(o.channel_code for o in orders)
-            insight.preferred_channel = channel_counts.most_common(1)[0][0]
+        customers = (
+            Customer.objects.filter(is_active=True)
+            .only("id", "code")
+            .iterator(chunk_size=batch_size)
+        )
+        # One reference time for the whole run
+        now = datetime.now(UTC)
+        count = 0
+        while batch := list(islice(customers, batch_size)):
+            count += cls._recalculate_batch(batch, backend, now)
+        return count
 
-        # Calculate RFM scores
-        insight.rfm_recency = cls._calculate_recency_score(
-            insight.days_since_last_order
+    @classmethod
+    def _reset_all(cls, batch_size: int) -> int:
+        """Reset metrics of all active customers (no backend configured)."""
+        now = datetime.now(UTC)
+        # One UPDATE for every existing insight that is not already reset
+        CustomerInsight.objects.filter(customer__is_active=True).exclude(
+            **_RESET_FIELDS
+        ).update(**_RESET_FIELDS, calculated_at=now)
+
+        # Ids are read up front: inserting while iterating the same join is unsafe
+        missing = list(
+            Customer.objects.filter(is_active=True, insight__isnull=True).values_list(
+                "id", flat=True
+            )
         )
-        insight.rfm_frequency = cls._calculate_frequency_score(insight.total_orders)
-        insight.rfm_monetary = cls._calculate_monetary_score(insight.total_spent_q)
-        insight.rfm_segment = cls._calculate_rfm_segment(
-            insight.rfm_recency,
-            insight.rfm_frequency,
-            insight.rfm_monetary,
+        CustomerInsight.objects.bulk_create(
+            [CustomerInsight(customer_id=customer_id, **_RESET_FIELDS) for customer_id in missing],
+            batch_size=batch_size,
+            ignore_conflicts=True,
         )
+        return Customer.objects.filter(is_active=True).count()
 
-        # Churn risk
-        insight.churn_risk = cls._calculate_churn_risk(
-            insight.days_since_last_order,
-            insight.average_days_between_orders,
+    @classmethod
+    def _recalculate_batch(
+        cls,
+        customers: list[Customer],
+        backend: OrderHistoryBackend | None,
+        now: datetime,
+    ) -> int:
+        """Recalculate and persist insights for one batch of customers."""
+        existing = CustomerInsight.objects.in_bulk(
+            [c.id for c in customers], field_name="customer_id"
         )
+        bulk = isinstance(backend, BulkOrderHistoryBackend)
+        if bulk:
+            # One backend call per batch instead of two per customer
+            stats_by_code = backend.get_order_stats_bulk([c.code for c in customers])
+            # Only customers with orders have patterns to fetch
+            codes = [code for code, stats in stats_by_code.items() if stats.total_orders]
+            if isinstance(backend, OrderPatternBackend):
+                patterns_by_code = backend.get_customer_order_patterns_bulk(
+                    codes, limit=RECENT_ORDERS_LIMIT
+                )
+            else:
+                patterns_by_code = {
+                    code: _patterns_from_orders(orders)
+                    for code, orders in backend.get_customer_orders_bulk(
+                        codes, limit=RECENT_ORDERS_LIMIT
+                    ).items()
+                }
+
+        to_update = []
+        to_create = []
+        update_fields = set()
+        skipped = 0
+
+        for customer in customers:
+            try:
+                if bulk:
+                    fields = cls._compute_insight_fields(
+                        stats_by_code[customer.code],
+                        patterns_by_code.get(customer.code, []),
+                        now=now,
+                    )
+                else:
+                    fields = cls._insight_fields(backend, customer.code, now=now)
+            except (ValueError, TypeError, LookupError) as exc:
+                logger.warning("recalculate_all: skipped customer %s: %s", customer.code, exc)
+                skipped += 1
+                continue
+
+            insight = existing.get(customer.id)
+            if insight is None:
+                insight = CustomerInsight(customer=customer, **fields)
+                to_create.append(insight)
+            else:
+                changed = cls._apply_fields(insight, fields)
+                if not changed:
+                    continue
+                to_update.append(insight)
+                update_fields.update(changed)
+            # bulk_update() does not apply auto_now
+            insight.calculated_at = now
+
+        # One commit per batch for both writes
+        with transaction.atomic():
+            if to_update:
+                CustomerInsight.objects.bulk_update(
+                    to_update,
+                    fields=sorted(update_fields | {"calculated_at"}),
+                )
+            if to_create:
+                # A concurrent recalculate() may have created some meanwhile
+                CustomerInsight.objects.bulk_create(to_create, ignore_conflicts=True)
+        return len(customers) - skipped
 
-        # Predicted LTV (simple: avg_ticket * projected_orders_per_year)
-        insight.predicted_ltv_q = cls._calculate_ltv(
-            insight.average_ticket_q,
-            insight.average_days_between_orders,
-            insight.total_orders,
-        )
+    @classmethod
+    def _apply_fields(cls, insight: CustomerInsight, fields: dict) -> list[str]:
+        """Set computed values on insight; return names of fields that changed."""
+        changed = []
+        for name, value in fields.items():
+            if getattr(insight, name) != value:
+                setattr(insight, name, value)
+                changed.append(name)
+        return changed
 
-        insight.calculation_version = "v2"
-        insight.save()
+    @classmethod
+    def _insight_fields(
+        cls,
+        backend: OrderHistoryBackend | None,
+        customer_code: str,
+        now: datetime | None = None,
+    ) -> dict:
+        """Fetch order data for customer and compute insight field values."""
+        if not backend:
+            # No backend configured - reset metrics
+            return dict(_RESET_FIELDS)
 
-        return insight
+        stats = backend.get_order_stats(customer_code)
+        if stats.total_orders == 0:
+            # No orders: nothing to analyze, skip the second backend call
+            patterns = []
+        elif isinstance(backend, OrderPatternBackend):
+            patterns = backend.get_customer_order_patterns(
+                customer_code, limit=RECENT_ORDERS_LIMIT
+            )
+        else:
+            patterns = _patterns_from_orders(
+                backend.get_customer_orders(customer_code, limit=RECENT_ORDERS_LIMIT)
+            )
+        return cls._compute_insight_fields(stats, patterns, now=now)
 
     @classmethod
-    def recalculate_all(cls) -> int:
+    def _compute_insight_fields(
+        cls,
+        stats: OrderStats,
+        patterns: list[tuple[datetime, str]],
+        now: datetime | None = None,
+    ) -> dict:
         """
-        Recalculate insights for all active customers.
+        Compute insight field values from order data (no database access).
 
-        Uses iterator() to avoid loading all customers into memory.
+        ``now`` is the reference time for recency; recalculate_all() passes
+        one value for the whole run.
 
-        Returns:
-            Number of customers processed
+        Pattern fields (preferred weekday/hour/channel, channels used) are
+        only included when there are orders, leaving previous values intact.
+        ``patterns`` holds (ordered_at, channel_code) of the recent orders.
         """
-        count = 0
-        for customer in Customer.objects.filter(is_active=True).only("code").iterator():
-            try:
-                cls.recalculate(customer.code)
-                count += 1
-            except (ValueError, TypeError, LookupError) as exc:
-                logger.warning("recalculate_all: skipped customer %s: %s", customer.code, exc)
-        return count
+        fields = {
+            "total_orders": stats.total_orders,
+            "total_spent_q": stats.total_spent_q,
+            "average_ticket_q": stats.average_order_q,
+            "first_order_at": stats.first_order_at,
+            "last_order_at": stats.last_order_at,
+        }
+
+        # Days since last order
+        days_since_last_order = None
+        if stats.last_order_at:
+            delta = (now or datetime.now(UTC)) - stats.last_order_at
+            days_since_last_order = delta.days
+        fields["days_since_last_order"] = days_since_last_order
+
+        # Average days between orders
+        average_days_between_orders = None
+        if stats.total_orders > 1 and stats.first_order_at and stats.last_order_at:
+            total_days = (stats.last_order_at - stats.first_order_at).days
+            # Rounded like the model field (1 decimal place) so the value
+            # read back from the DB compares equal on the next run
+            average_days_between_orders = Decimal(
+                total_days / (stats.total_orders - 1)
+            ).quantize(_ONE_DECIMAL)
+        fields["average_days_between_orders"] = average_days_between_orders
+
+        if patterns:
+            # Count weekday (0=Monday, 6=Sunday), hour and channel in one pass
+            weekdays = Counter()
+            hours = Counter()
+            channels = Counter()
+            for ordered_at, channel_code in patterns:
+                weekdays[ordered_at.weekday()] += 1
+                hours[ordered_at.hour] += 1
+                channels[channel_code] += 1
+
+            # Most frequent value; ties go to the first seen (most recent order)
+            fields["preferred_weekday"] = max(weekdays, key=weekdays.get)
+            fields["preferred_hour"] = max(hours, key=hours.get)
+            fields["preferred_channel"] = max(channels, key=channels.get)
+            fields["channels_used"] = list(channels)
+
+        # RFM scores
+        rfm_recency = cls._calculate_recency_score(days_since_last_order)
+        rfm_frequency = cls._calculate_frequency_score(stats.total_orders)
+        rfm_monetary = cls._calculate_monetary_score(stats.total_spent_q)
+        fields["rfm_recency"] = rfm_recency
+        fields["rfm_frequency"] = rfm_frequency
+        fields["rfm_monetary"] = rfm_monetary
+        fields["rfm_segment"] = cls._calculate_rfm_segment(
+            rfm_recency,
+            rfm_frequency,
+            rfm_monetary,
+        )
+
+        # Churn risk
+        fields["churn_risk"] = cls._calculate_churn_risk(
+            days_since_last_order,
+            average_days_between_orders,
+        )
+
+        # Predicted LTV (simple: avg_ticket * projected_orders_per_year)
+        fields["predicted_ltv_q"] = cls._calculate_ltv(
+            stats.average_order_q,
+            average_days_between_orders,
+            stats.total_orders,
+        )
+
+        fields["calculation_version"] = "v2"
+        return fields
 
     # ======================================================================
     # RFM Calculation Helpers
@@ -184,59 +419,25 @@ class InsightService:
         """Calculate RFM Recency score (1-5)."""
         if days is None:
             return 1
-        if days <= 7:
-            return 5
-        if days <= 30:
-            return 4
-        if days <= 90:
-            return 3
-        if days <= 180:
-            return 2
-        return 1
+        return _RECENCY_SCORES[bisect_left(_RECENCY_MAX_DAYS, days)]
 
     @classmethod
     def _calculate_frequency_score(cls, orders: int) -> int:
         """Calculate RFM Frequency score (1-5)."""
-        if orders >= 20:
-            return 5
-        if orders >= 10:
-            return 4
-        if orders >= 5:
-            return 3
-        if orders >= 2:
-            return 2
-        return 1
+        return 1 + bisect_right(_FREQUENCY_MIN_ORDERS, orders)
 
     @classmethod
     def _calculate_monetary_score(cls, total_q: int) -> int:
         """Calculate RFM Monetary score (1-5)."""
-        # Adjust thresholds based on business
-        if total_q >= 1000000:  # R$ 10.000
-            return 5
-        if total_q >= 500000:  # R$ 5.000
-            return 4
-        if total_q >= 200000:  # R$ 2.000
-            return 3
-        if total_q >= 50000:  # R$ 500
-            return 2
-        return 1
+        return 1 + bisect_right(_MONETARY_MIN_Q, total_q)
 
     @classmethod
     def _calculate_rfm_segment(cls, r: int, f: int, m: int) -> str:
         """Determine RFM segment."""
-        score = r + f + m
-
-        if score >= 13:
-            return "champion"
-        if r >= 4 and f >= 3:
-            return "loyal_customer"
-        if r >= 4 and f <= 2:
-            return "recent_customer"
-        if r <= 2 and f >= 3:
-            return "at_risk"
-        if r <= 2 and f <= 2:
-            return "lost"
-        return "regular"
+        segment = _RFM_SEGMENTS.get((r, f, m))
+        if segment is None:
+            segment = _rfm_segment(r, f, m)
+        return segment
 
     @classmethod
     def _calculate_ltv(
@@ -308,23 +509,23 @@ class InsightService:
     ) -> Decimal:
         """Calculate simplified churn risk."""
         if days_since is None:
-            return Decimal("0.5")
+            return _CHURN_0_5
 
         if avg_days and avg_days > 0:
-            ratio = Decimal(days_since) / avg_days
-            if ratio > 3:
-                return Decimal("0.9")
-            if ratio > 2:
-                return Decimal("0.7")
-            if ratio > 1.5:
-                return Decimal("0.4")
-            return Decimal("0.1")
+            # Compare days_since / avg_days against 3, 2 and 1.5 without dividing
+            if days_since > avg_days * 3:
+                return _CHURN_0_9
+            if days_since > avg_days * 2:
+                return _CHURN_0_7
+            if days_since * 2 > avg_days * 3:
+                return _CHURN_0_4
+            return _CHURN_0_1
 
         # No history, use absolute days
         if days_since > 90:
-            return Decimal("0.8")
+            return _CHURN_0_8
         if days_since > 60:
-            return Decimal("0.5")
+            return _CHURN_0_5
         if days_since > 30:
-            return Decimal("0.3")
-        return Decimal("0.1")
+            return _CHURN_0_3
+        return _CHURN_0_1
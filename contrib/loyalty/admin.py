@@ -1,11 +1,27 @@
 """Loyalty admin."""
 
+from functools import lru_cache
+
 from django.contrib import admin
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Least
 from django.utils.html import format_html
 
+from guestman.admin import CustomerLinkMixin
 from guestman.contrib.loyalty.models import LoyaltyAccount, LoyaltyTransaction
 
 
+@lru_cache(maxsize=64)
+def _badge_html(color, text_color, label):
+    return format_html(
+        '<span style="background:{}; color:{}; padding:2px 8px; '
+        'border-radius:3px; font-size:11px;">{}</span>',
+        color,
+        text_color,
+        label,
+    )
+
+
 class LoyaltyTransactionInline(admin.TabularInline):
     model = LoyaltyTransaction
     extra = 0
@@ -20,7 +36,7 @@ class LoyaltyTransactionInline(admin.TabularInline):
 
 
 @admin.register(LoyaltyAccount)
-class LoyaltyAccountAdmin(admin.ModelAdmin):
+class LoyaltyAccountAdmin(CustomerLinkMixin, admin.ModelAdmin):
     list_display = [
         "customer_link",
         "points_balance",
@@ -33,26 +49,33 @@ class LoyaltyAccountAdmin(admin.ModelAdmin):
     list_filter = ["tier", "is_active"]
     search_fields = ["customer__code", "customer__first_name"]
     raw_id_fields = ["customer"]
+    list_select_related = ["customer"]
     readonly_fields = ["enrolled_at", "updated_at"]
     inlines = [LoyaltyTransactionInline]
 
-    def tier_badge(self, obj):
-        colors = {
-            "bronze": "#cd7f32",
-            "silver": "#c0c0c0",
-            "gold": "#ffd700",
-            "platinum": "#e5e4e2",
-        }
-        color = colors.get(obj.tier, "#6c757d")
-        text_color = "#000" if obj.tier in ("gold", "silver", "platinum") else "#fff"
-        return format_html(
-            '<span style="background:{}; color:{}; padding:2px 8px; '
-            'border-radius:3px; font-size:11px;">{}</span>',
-            color,
-            text_color,
-            obj.get_tier_display(),
+    def get_queryset(self, request):
+        # Progress computed in SQL so the column can be sorted
+        return super().get_queryset(request).annotate(
+            _stamps_progress_pct=Case(
+                When(stamps_target__lte=0, then=Value(0)),
+                default=Least(Value(100), F("stamps_current") * 100 / F("stamps_target")),
+            )
         )
 
+    # tier -> (background, text) colors
+    TIER_COLORS = {
+        "bronze": ("#cd7f32", "#fff"),
+        "silver": ("#c0c0c0", "#000"),
+        "gold": ("#ffd700", "#000"),
+        "platinum": ("#e5e4e2", "#000"),
+    }
+    DEFAULT_TIER_COLORS = ("#6c757d", "#fff")
+
+    def tier_badge(self, obj):
+        color, text_color = self.TIER_COLORS.get(obj.tier, self.DEFAULT_TIER_COLORS)
+        # Few distinct badges per language: render each once
+        return _badge_html(color, text_color, str(obj.get_tier_display()))
+
     tier_badge.short_description = "Nível"
 
     def stamps_progress(self, obj):
@@ -66,14 +89,7 @@ class LoyaltyAccountAdmin(admin.ModelAdmin):
         )
 
     stamps_progress.short_description = "Carimbos"
-
-    def customer_link(self, obj):
-        from django.urls import reverse
-
-        url = reverse("admin:guestman_customer_change", args=[obj.customer.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.customer.code)
-
-    customer_link.short_description = "Cliente"
+    stamps_progress.admin_order_field = "_stamps_progress_pct"
 
 
 @admin.register(LoyaltyTransaction)
@@ -88,6 +104,7 @@ class LoyaltyTransactionAdmin(admin.ModelAdmin):
     ]
     list_filter = ["transaction_type"]
     search_fields = ["account__customer__code", "description", "reference"]
+    list_select_related = ["account__customer"]
     readonly_fields = [
         "account",
         "transaction_type",
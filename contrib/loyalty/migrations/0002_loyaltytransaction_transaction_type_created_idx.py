@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guestman_loyalty', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loyaltytransaction',
+            index=models.Index(fields=['transaction_type', '-created_at'], name='guestman_lo_transac_2aa6e1_idx'),
+        ),
+    ]
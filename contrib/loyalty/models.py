@@ -161,6 +161,7 @@ class LoyaltyTransaction(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["account", "-created_at"]),
+            models.Index(fields=["transaction_type", "-created_at"]),
         ]
 
     def __str__(self):
@@ -1,8 +1,12 @@
 """Loyalty service — points, stamps, and tier management."""
 
 import logging
+from bisect import bisect_right
+from collections.abc import Iterator
 
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
 
 from guestman.contrib.loyalty.models import (
     LoyaltyAccount,
@@ -17,12 +21,33 @@ logger = logging.getLogger(__name__)
 
 
 # Tier thresholds (lifetime points)
-_TIER_THRESHOLDS = [
+_TIER_THRESHOLDS = (
     (5000, LoyaltyTier.PLATINUM),
     (2000, LoyaltyTier.GOLD),
     (500, LoyaltyTier.SILVER),
     (0, LoyaltyTier.BRONZE),
-]
+)
+
+# Same thresholds sorted ascending, searched with bisect
+_TIER_MIN_POINTS = tuple(threshold for threshold, _ in reversed(_TIER_THRESHOLDS))
+_TIERS = tuple(tier for _, tier in reversed(_TIER_THRESHOLDS))
+
+
+def _tier_for(lifetime_points: int, current: str) -> str:
+    """Tier matching lifetime points (current tier if none matches)."""
+    idx = bisect_right(_TIER_MIN_POINTS, lifetime_points) - 1
+    return _TIERS[idx] if idx >= 0 else current
+
+
+def _tier_after_earn(points: int) -> Case:
+    """UPDATE expression for the tier once ``points`` are added to lifetime_points."""
+    return Case(
+        *[
+            When(lifetime_points__gte=threshold - points, then=Value(tier))
+            for threshold, tier in _TIER_THRESHOLDS
+        ],
+        default=F("tier"),
+    )
 
 
 class LoyaltyService:
@@ -30,7 +55,12 @@ class LoyaltyService:
     Service for loyalty program operations.
 
     Uses @classmethod for extensibility (consistent with other contrib services).
-    All point mutations use transaction.atomic().
+    All point mutations use transaction.atomic(); points are changed with
+    atomic F() UPDATEs, stamps under a row lock.
+
+    Single-account mutations use atomic(savepoint=False) and raise business
+    errors only after the block exits, so a caught GuestmanError never
+    marks the caller's transaction for rollback.
     """
 
     @classmethod
@@ -49,7 +79,17 @@ class LoyaltyService:
         Raises:
             Customer.DoesNotExist: If customer not found
         """
+        # Already enrolled (the common case): one query, no write
+        account = (
+            LoyaltyAccount.objects.select_related("customer")
+            .filter(customer__code=customer_code, customer__is_active=True)
+            .first()
+        )
+        if account is not None:
+            return account
+
         customer = Customer.objects.get(code=customer_code, is_active=True)
+        # get_or_create still covers a concurrent enroll between the two reads
         account, _ = LoyaltyAccount.objects.get_or_create(customer=customer)
         return account
 
@@ -98,27 +138,108 @@ class LoyaltyService:
         if points <= 0:
             raise GuestmanError("LOYALTY_INVALID_POINTS", message="Points must be positive")
 
+        with transaction.atomic(savepoint=False):
+            # Atomic increment: no row lock is held before the UPDATE
+            # tier goes first: MySQL evaluates SET left to right on updated values
+            updated = cls._active_accounts(customer_code).update(
+                tier=_tier_after_earn(points),
+                points_balance=F("points_balance") + points,
+                lifetime_points=F("lifetime_points") + points,
+                updated_at=timezone.now(),
+            )
+            if updated:
+                # Row is locked by our UPDATE until commit, so this read is consistent
+                account = cls._get_active_account(customer_code)
+
+                tx = LoyaltyTransaction.objects.create(
+                    account=account,
+                    transaction_type=TransactionType.EARN,
+                    points=points,
+                    balance_after=account.points_balance,
+                    description=description,
+                    reference=reference,
+                    created_by=created_by,
+                )
+
+        if not updated:
+            raise GuestmanError("LOYALTY_NOT_ENROLLED", customer_code=customer_code)
+        return tx
+
+    @classmethod
+    def bulk_earn_points(
+        cls,
+        entries: list[tuple[str, int, str]],
+        reference: str = "",
+        created_by: str = "",
+        batch_size: int = 500,
+    ) -> list[LoyaltyTransaction]:
+        """
+        Award points to many customers at once (campaigns, imports).
+
+        All-or-nothing: accounts are locked and updated with one bulk UPDATE,
+        transactions are written with multi-row INSERTs. A customer may
+        appear more than once; balance_after follows entry order.
+
+        Args:
+            entries: (customer_code, points, description) tuples
+            reference: External reference shared by all entries
+            created_by: Who triggered the earn
+            batch_size: Rows per UPDATE/INSERT statement
+
+        Returns:
+            Created LoyaltyTransactions, in entry order
+
+        Raises:
+            GuestmanError: If any customer is not enrolled or points <= 0
+        """
+        for _, points, _ in entries:
+            if points <= 0:
+                raise GuestmanError("LOYALTY_INVALID_POINTS", message="Points must be positive")
+
+        codes = {code for code, _, _ in entries}
+        now = timezone.now()
+
         with transaction.atomic():
-            account = cls._get_active_account_for_update(customer_code)
+            accounts = {
+                account.customer.code: account
+                for account in LoyaltyAccount.objects.select_for_update()
+                .select_related("customer")
+                .filter(customer__code__in=codes, customer__is_active=True, is_active=True)
+            }
+
+            transactions = []
+            for code, points, description in entries:
+                account = accounts.get(code)
+                if account is None:
+                    raise GuestmanError("LOYALTY_NOT_ENROLLED", customer_code=code)
+
+                account.points_balance += points
+                account.lifetime_points += points
+                transactions.append(
+                    LoyaltyTransaction(
+                        account=account,
+                        transaction_type=TransactionType.EARN,
+                        points=points,
+                        balance_after=account.points_balance,
+                        description=description,
+                        reference=reference,
+                        created_by=created_by,
+                    )
+                )
 
-            account.points_balance += points
-            account.lifetime_points += points
-            account.save(update_fields=["points_balance", "lifetime_points", "updated_at"])
-
-            tx = LoyaltyTransaction.objects.create(
-                account=account,
-                transaction_type=TransactionType.EARN,
-                points=points,
-                balance_after=account.points_balance,
-                description=description,
-                reference=reference,
-                created_by=created_by,
-            )
+            for account in accounts.values():
+                # bulk_update() skips auto_now and the per-call tier check
+                account.tier = _tier_for(account.lifetime_points, account.tier)
+                account.updated_at = now
 
-            # Auto-upgrade tier
-            cls._update_tier(account)
+            LoyaltyAccount.objects.bulk_update(
+                accounts.values(),
+                ["points_balance", "lifetime_points", "tier", "updated_at"],
+                batch_size=batch_size,
+            )
+            LoyaltyTransaction.objects.bulk_create(transactions, batch_size=batch_size)
 
-        return tx
+        return transactions
 
     @classmethod
     def redeem_points(
@@ -148,29 +269,35 @@ class LoyaltyService:
         if points <= 0:
             raise GuestmanError("LOYALTY_INVALID_POINTS", message="Points must be positive")
 
-        with transaction.atomic():
-            account = cls._get_active_account_for_update(customer_code)
-
-            if account.points_balance < points:
-                raise GuestmanError(
-                    "LOYALTY_INSUFFICIENT_POINTS",
-                    available=account.points_balance,
-                    requested=points,
+        with transaction.atomic(savepoint=False):
+            # Conditional decrement: the balance check and the write are one statement
+            updated = cls._active_accounts(customer_code).filter(
+                points_balance__gte=points,
+            ).update(
+                points_balance=F("points_balance") - points,
+                updated_at=timezone.now(),
+            )
+            account = cls._active_accounts(customer_code).select_related("customer").first()
+
+            if updated:
+                tx = LoyaltyTransaction.objects.create(
+                    account=account,
+                    transaction_type=TransactionType.REDEEM,
+                    points=-points,
+                    balance_after=account.points_balance,
+                    description=description,
+                    reference=reference,
+                    created_by=created_by,
                 )
 
-            account.points_balance -= points
-            account.save(update_fields=["points_balance", "updated_at"])
-
-            tx = LoyaltyTransaction.objects.create(
-                account=account,
-                transaction_type=TransactionType.REDEEM,
-                points=-points,
-                balance_after=account.points_balance,
-                description=description,
-                reference=reference,
-                created_by=created_by,
+        if account is None:
+            raise GuestmanError("LOYALTY_NOT_ENROLLED", customer_code=customer_code)
+        if not updated:
+            raise GuestmanError(
+                "LOYALTY_INSUFFICIENT_POINTS",
+                available=account.points_balance,
+                requested=points,
             )
-
         return tx
 
     @classmethod
@@ -197,32 +324,35 @@ class LoyaltyService:
         Raises:
             GuestmanError: If not enrolled
         """
-        with transaction.atomic():
+        with transaction.atomic(savepoint=False):
             account = cls._get_active_account_for_update(customer_code)
 
-            account.stamps_current += 1
-            card_completed = False
-
-            if account.stamps_current >= account.stamps_target:
-                account.stamps_current = 0
-                account.stamps_completed += 1
-                card_completed = True
-
-            account.save(update_fields=[
-                "stamps_current",
-                "stamps_completed",
-                "updated_at",
-            ])
-
-            LoyaltyTransaction.objects.create(
-                account=account,
-                transaction_type=TransactionType.STAMP,
-                points=1,
-                balance_after=account.stamps_current,
-                description=description or ("Cartela completa!" if card_completed else "Carimbo"),
-                reference=reference,
-            )
+            if account is not None:
+                account.stamps_current += 1
+                card_completed = False
+
+                if account.stamps_current >= account.stamps_target:
+                    account.stamps_current = 0
+                    account.stamps_completed += 1
+                    card_completed = True
+
+                account.save(update_fields=[
+                    "stamps_current",
+                    "stamps_completed",
+                    "updated_at",
+                ])
+
+                LoyaltyTransaction.objects.create(
+                    account=account,
+                    transaction_type=TransactionType.STAMP,
+                    points=1,
+                    balance_after=account.stamps_current,
+                    description=description or ("Cartela completa!" if card_completed else "Carimbo"),
+                    reference=reference,
+                )
 
+        if account is None:
+            raise GuestmanError("LOYALTY_NOT_ENROLLED", customer_code=customer_code)
         return account, card_completed
 
     @classmethod
@@ -236,7 +366,44 @@ class LoyaltyService:
             LoyaltyTransaction.objects.filter(
                 account__customer__code=customer_code,
                 account__customer__is_active=True,
-            )[:limit]
+            ).select_related("account__customer")[:limit]
+        )
+
+    @classmethod
+    def iter_transactions(
+        cls,
+        customer_code: str,
+        chunk_size: int = 500,
+    ) -> Iterator[LoyaltyTransaction]:
+        """
+        Stream the full transaction history for a customer (exports).
+
+        Unlike get_transactions, rows are fetched in chunks and never held
+        in memory all at once.
+
+        Args:
+            customer_code: Customer code
+            chunk_size: Rows fetched per database round trip
+
+        Returns:
+            Iterator of LoyaltyTransaction, newest first
+        """
+        return (
+            LoyaltyTransaction.objects.filter(
+                account__customer__code=customer_code,
+                account__customer__is_active=True,
+            )
+            .select_related("account__customer")
+            .iterator(chunk_size=chunk_size)
+        )
+
+    @classmethod
+    def _active_accounts(cls, customer_code: str):
+        """Queryset of the customer's active loyalty account (for UPDATEs)."""
+        return LoyaltyAccount.objects.filter(
+            customer__code=customer_code,
+            customer__is_active=True,
+            is_active=True,
         )
 
     @classmethod
@@ -252,33 +419,20 @@ class LoyaltyService:
             raise GuestmanError("LOYALTY_NOT_ENROLLED", customer_code=customer_code)
 
     @classmethod
-    def _get_active_account_for_update(cls, customer_code: str) -> LoyaltyAccount:
+    def _get_active_account_for_update(cls, customer_code: str) -> LoyaltyAccount | None:
         """
-        Get active loyalty account with row-level lock for mutation.
+        Get active loyalty account with row-level lock for mutation (None if not enrolled).
 
         MUST be called inside transaction.atomic().
-        Prevents lost-update race conditions on concurrent earn/redeem/stamp.
+        Prevents lost-update race conditions on concurrent stamps.
+        The customer is loaded with the account; where the backend supports
+        SELECT ... FOR UPDATE OF (not MySQL/MariaDB), only the account row
+        is locked.
         """
-        try:
-            return (
-                LoyaltyAccount.objects
-                .select_for_update()
-                .select_related("customer")
-                .get(
-                    customer__code=customer_code,
-                    customer__is_active=True,
-                    is_active=True,
-                )
-            )
-        except LoyaltyAccount.DoesNotExist:
-            raise GuestmanError("LOYALTY_NOT_ENROLLED", customer_code=customer_code)
-
-    @classmethod
-    def _update_tier(cls, account: LoyaltyAccount) -> None:
-        """Auto-upgrade tier based on lifetime points."""
-        for threshold, tier in _TIER_THRESHOLDS:
-            if account.lifetime_points >= threshold:
-                if account.tier != tier:
-                    account.tier = tier
-                    account.save(update_fields=["tier", "updated_at"])
-                break
+        lock_of = ("self",) if connection.features.has_select_for_update_of else ()
+        return (
+            cls._active_accounts(customer_code)
+            .select_related("customer")
+            .select_for_update(of=lock_of)
+            .first()
+        )
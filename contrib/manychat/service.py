@@ -1,7 +1,16 @@
 """Manychat sync service."""
 
+import hashlib
+
+from django.db.models import Q
+
 from guestman.models import Customer
-from guestman.contrib.identifiers.models import CustomerIdentifier, IdentifierType
+from guestman.contrib.identifiers.models import (
+    CustomerIdentifier,
+    IdentifierType,
+    normalize_identifier_value,
+)
+from guestman.utils import normalize_phone
 
 
 class ManychatService:
@@ -41,17 +50,14 @@ class ManychatService:
         if not manychat_id:
             raise ValueError("Subscriber data must contain 'id' field")
 
-        # Try to find existing customer by Manychat ID
-        customer = cls._find_by_manychat_id(manychat_id)
+        # Find existing customer by Manychat ID, else by other identifiers
+        customer, by_manychat_id = cls._find_existing(manychat_id, subscriber_data)
 
-        if customer:
+        if customer and by_manychat_id:
             # Update existing customer
             cls._update_customer(customer, subscriber_data)
             return customer, False
 
-        # Try to find by other identifiers
-        customer = cls._find_by_identifiers(subscriber_data)
-
         if customer:
             # Link Manychat ID to existing customer
             cls._add_manychat_identifiers(customer, subscriber_data, source_system)
@@ -64,65 +70,53 @@ class ManychatService:
         return customer, True
 
     @classmethod
-    def _find_by_manychat_id(cls, manychat_id: str) -> Customer | None:
-        """Find customer by Manychat ID."""
-        try:
-            ident = CustomerIdentifier.objects.select_related("customer").get(
-                identifier_type=IdentifierType.MANYCHAT,
-                identifier_value=manychat_id,
-            )
-            return ident.customer if ident.customer.is_active else None
-        except CustomerIdentifier.DoesNotExist:
-            return None
+    def _find_existing(cls, manychat_id: str, data: dict) -> tuple[Customer | None, bool]:
+        """
+        Find customer by Manychat ID, else by phone, email or WhatsApp phone.
 
-    @classmethod
-    def _find_by_identifiers(cls, data: dict) -> Customer | None:
-        """Try to find customer by phone, email, or other identifiers."""
-        # Try phone
-        if data.get("phone"):
-            phone = cls._normalize_phone(data["phone"])
-            try:
-                ident = CustomerIdentifier.objects.select_related("customer").get(
-                    identifier_type=IdentifierType.PHONE,
-                    identifier_value=phone,
-                )
-                return ident.customer if ident.customer.is_active else None
-            except CustomerIdentifier.DoesNotExist:
-                pass
+        All candidates are fetched in one query, then checked in that
+        priority order. An inactive customer on the Manychat ID falls back
+        to the other identifiers; on those, the first match decides.
 
-        # Try email
+        Returns:
+            Tuple of (Customer or None, found by Manychat ID)
+        """
+        by_id = (IdentifierType.MANYCHAT, str(manychat_id))
+        candidates = []
+        if data.get("phone"):
+            candidates.append((IdentifierType.PHONE, cls._normalize_phone(data["phone"])))
         if data.get("email"):
-            email = data["email"].lower().strip()
-            try:
-                ident = CustomerIdentifier.objects.select_related("customer").get(
-                    identifier_type=IdentifierType.EMAIL,
-                    identifier_value=email,
-                )
-                return ident.customer if ident.customer.is_active else None
-            except CustomerIdentifier.DoesNotExist:
-                pass
-
-        # Try WhatsApp phone
+            candidates.append((IdentifierType.EMAIL, data["email"].lower().strip()))
         if data.get("wa_phone"):
-            phone = cls._normalize_phone(data["wa_phone"])
-            try:
-                ident = CustomerIdentifier.objects.select_related("customer").get(
-                    identifier_type=IdentifierType.WHATSAPP,
-                    identifier_value=phone,
-                )
-                return ident.customer if ident.customer.is_active else None
-            except CustomerIdentifier.DoesNotExist:
-                pass
-
-        return None
+            candidates.append((IdentifierType.WHATSAPP, cls._normalize_phone(data["wa_phone"])))
+
+        query = Q()
+        for id_type, id_value in [by_id, *candidates]:
+            query |= Q(identifier_type=id_type, identifier_value=id_value)
+        # Only the match key and the customer are read from each identifier
+        matches = {
+            (ident.identifier_type, ident.identifier_value): ident
+            for ident in CustomerIdentifier.objects.select_related("customer")
+            .only("identifier_type", "identifier_value", "customer")
+            .filter(query)
+        }
+
+        ident = matches.get(by_id)
+        if ident is not None and ident.customer.is_active:
+            return ident.customer, True
+
+        for candidate in candidates:
+            ident = matches.get(candidate)
+            if ident is not None:
+                return (ident.customer if ident.customer.is_active else None), False
+
+        return None, False
 
     @classmethod
     def _create_customer(cls, data: dict, source_system: str) -> Customer:
         """Create new customer from Manychat data."""
-        import hashlib
-
-        # Generate code from Manychat ID
-        hash_value = hashlib.md5(data["id"].encode()).hexdigest()[:8].upper()
+        # Generate code from Manychat ID (4-byte digest = 8 hex chars)
+        hash_value = hashlib.blake2b(data["id"].encode(), digest_size=4).hexdigest().upper()
         code = f"MC-{hash_value}"
 
         return Customer.objects.create(
@@ -138,33 +132,26 @@ class ManychatService:
     @classmethod
     def _update_customer(cls, customer: Customer, data: dict) -> None:
         """Update customer with Manychat data."""
-        updated = False
-
-        if data.get("first_name") and not customer.first_name:
-            customer.first_name = data["first_name"]
-            updated = True
-
-        if data.get("last_name") and not customer.last_name:
-            customer.last_name = data["last_name"]
-            updated = True
+        changed = []
 
-        if data.get("email") and not customer.email:
-            customer.email = data["email"]
-            updated = True
-
-        if data.get("phone") and not customer.phone:
-            customer.phone = data["phone"]
-            updated = True
+        # Only fill fields that are still empty
+        for field in ("first_name", "last_name", "email", "phone"):
+            if data.get(field) and not getattr(customer, field):
+                setattr(customer, field, data[field])
+                changed.append(field)
 
         # Update custom fields in metadata
         if data.get("custom_fields"):
             if "manychat_custom_fields" not in customer.metadata:
                 customer.metadata["manychat_custom_fields"] = {}
             customer.metadata["manychat_custom_fields"].update(data["custom_fields"])
-            updated = True
+            changed.append("metadata")
 
-        if updated:
-            customer.save()
+        if changed:
+            # Customer.save() assigns the default group when none is set
+            if not customer.group_id:
+                changed.append("group")
+            customer.save(update_fields=[*changed, "updated_at"])
 
     @classmethod
     def _add_manychat_identifiers(
@@ -176,10 +163,16 @@ class ManychatService:
         """Add Manychat-related identifiers to customer."""
         identifiers_to_add = []
 
-        # Manychat ID
+        # Manychat ID: primary unless the customer already has a primary one
+        # (bulk_create skips the demotion done by CustomerIdentifier.save())
         if data.get("id"):
+            has_primary = CustomerIdentifier.objects.filter(
+                customer_id=customer.pk,
+                identifier_type=IdentifierType.MANYCHAT,
+                is_primary=True,
+            ).exists()
             identifiers_to_add.append(
-                (IdentifierType.MANYCHAT, data["id"], True)
+                (IdentifierType.MANYCHAT, data["id"], not has_primary)
             )
 
         # Phone
@@ -218,20 +211,23 @@ class ManychatService:
                 (IdentifierType.TELEGRAM, data["tg_id"], False)
             )
 
-        for id_type, id_value, is_primary in identifiers_to_add:
-            CustomerIdentifier.objects.get_or_create(
-                identifier_type=id_type,
-                identifier_value=id_value,
-                defaults={
-                    "customer": customer,
-                    "is_primary": is_primary,
-                    "source_system": source_system,
-                },
-            )
+        # One multi-row INSERT; identifiers that already exist are skipped.
+        # Platform IDs may arrive as ints; values are stored as save() would.
+        CustomerIdentifier.objects.bulk_create(
+            [
+                CustomerIdentifier(
+                    customer_id=customer.pk,
+                    identifier_type=id_type,
+                    identifier_value=normalize_identifier_value(id_type, id_value),
+                    is_primary=is_primary,
+                    source_system=source_system,
+                )
+                for id_type, id_value, is_primary in identifiers_to_add
+            ],
+            ignore_conflicts=True,
+        )
 
     @staticmethod
     def _normalize_phone(phone: str) -> str:
         """Normalize phone number. Delegates to centralized normalize_phone."""
-        from guestman.utils import normalize_phone
-
         return normalize_phone(phone)
@@ -3,6 +3,7 @@
 from django.contrib import admin
 
 from guestman.contrib.preferences.models import CustomerPreference
+from guestman.contrib.preferences.service import invalidate_preferences_cache
 
 
 @admin.register(CustomerPreference)
@@ -20,3 +21,19 @@ class CustomerPreferenceAdmin(admin.ModelAdmin):
     search_fields = ["customer__code", "customer__first_name", "key"]
     readonly_fields = ["created_at", "updated_at"]
     raw_id_fields = ["customer"]
+    list_select_related = ["customer"]
+
+    # Admin writes bypass PreferenceService, so drop its cached dicts here
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_preferences_cache(obj.customer.code)
+
+    def delete_model(self, request, obj):
+        code = obj.customer.code
+        super().delete_model(request, obj)
+        invalidate_preferences_cache(code)
+
+    def delete_queryset(self, request, queryset):
+        codes = set(queryset.values_list("customer__code", flat=True))
+        super().delete_queryset(request, queryset)
+        invalidate_preferences_cache(*codes)
@@ -8,3 +8,15 @@ class PreferencesConfig(AppConfig):
     name = "guestman.contrib.preferences"
     label = "guestman_preferences"
     verbose_name = _("Preferências")
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from guestman.contrib.preferences.service import (
+            forget_customer_preferences_cache,
+            invalidate_customer_preferences_cache,
+        )
+        from guestman.models import Customer
+
+        post_save.connect(invalidate_customer_preferences_cache, sender=Customer)
+        post_delete.connect(forget_customer_preferences_cache, sender=Customer)
@@ -3,8 +3,33 @@
 from decimal import Decimal
 from typing import Any
 
+from django.core.cache import cache
+
 from guestman.contrib.preferences.models import CustomerPreference, PreferenceType
 from guestman.models import Customer
+from guestman.services import customer as customer_service
+
+PREFERENCES_CACHE_TTL = 300
+
+
+def _preferences_cache_key(customer_code: str) -> str:
+    return f"v1:preferences:{customer_code}"
+
+
+def invalidate_preferences_cache(*customer_codes: str) -> None:
+    """Drop cached preference dicts for the given customers."""
+    cache.delete_many([_preferences_cache_key(code) for code in customer_codes])
+
+
+def invalidate_customer_preferences_cache(sender, instance, created=False, **kwargs):
+    """Drop cached preferences when a customer's code or is_active changed (post_save)."""
+    if not created:
+        invalidate_preferences_cache(*instance.stale_cache_codes())
+
+
+def forget_customer_preferences_cache(sender, instance, **kwargs):
+    """Drop cached preferences of a deleted customer (post_delete)."""
+    invalidate_preferences_cache(instance.code)
 
 
 class PreferenceService:
@@ -32,16 +57,8 @@ class PreferenceService:
         Returns:
             Preference value or None if not found
         """
-        try:
-            pref = CustomerPreference.objects.get(
-                customer__code=customer_code,
-                customer__is_active=True,
-                category=category,
-                key=key,
-            )
-            return pref.value
-        except CustomerPreference.DoesNotExist:
-            return None
+        # Served from the cached preferences dict (one query on a miss)
+        return cls.get_preferences_dict(customer_code).get(category, {}).get(key)
 
     @classmethod
     def set_preference(
@@ -72,10 +89,12 @@ class PreferenceService:
         Raises:
             Customer.DoesNotExist: If customer not found
         """
-        customer = Customer.objects.get(code=customer_code, is_active=True)
+        customer_id = customer_service.get_id(customer_code)
+        if customer_id is None:
+            raise Customer.DoesNotExist(f"Customer {customer_code} not found")
 
         pref, _ = CustomerPreference.objects.update_or_create(
-            customer=customer,
+            customer_id=customer_id,
             category=category,
             key=key,
             defaults={
@@ -85,8 +104,60 @@ class PreferenceService:
                 "source": source,
             },
         )
+        invalidate_preferences_cache(customer_code)
         return pref
 
+    @classmethod
+    def set_preferences_bulk(cls, rows: list[dict], batch_size: int = 500) -> int:
+        """
+        Set many preferences at once (create or update).
+
+        Customers are resolved in one query and rows written with
+        INSERT ... ON CONFLICT (customer, category, key) DO UPDATE.
+        Rows whose customer is missing or inactive are skipped; for a
+        repeated (customer, category, key) the last row wins.
+
+        Args:
+            rows: Dicts with customer_code, category, key, value and optional
+                preference_type, confidence, source
+            batch_size: Rows per INSERT statement
+
+        Returns:
+            Number of preferences written
+        """
+        codes = {row["customer_code"] for row in rows}
+        customer_ids = dict(
+            Customer.objects.filter(code__in=codes, is_active=True).values_list(
+                "code", "id"
+            )
+        )
+
+        # One row per conflict target: ON CONFLICT cannot touch a row twice
+        objs = {}
+        for row in rows:
+            customer_id = customer_ids.get(row["customer_code"])
+            if customer_id is None:
+                continue
+            objs[(customer_id, row["category"], row["key"])] = CustomerPreference(
+                customer_id=customer_id,
+                category=row["category"],
+                key=row["key"],
+                value=row["value"],
+                preference_type=row.get("preference_type", PreferenceType.EXPLICIT),
+                confidence=row.get("confidence", Decimal("1.00")),
+                source=row.get("source", ""),
+            )
+
+        CustomerPreference.objects.bulk_create(
+            objs.values(),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["customer", "category", "key"],
+            update_fields=["value", "preference_type", "confidence", "source", "updated_at"],
+        )
+        invalidate_preferences_cache(*customer_ids)
+        return len(objs)
+
     @classmethod
     def get_preferences(
         cls,
@@ -103,7 +174,7 @@ class PreferenceService:
         Returns:
             List of CustomerPreference
         """
-        qs = CustomerPreference.objects.filter(
+        qs = CustomerPreference.objects.select_related("customer").filter(
             customer__code=customer_code,
             customer__is_active=True,
         )
@@ -119,15 +190,24 @@ class PreferenceService:
         """
         Get all preferences as nested dict.
 
+        Cached per customer code; writes through this service and changes to
+        the customer's code or is_active invalidate it.
+
         Returns:
             {category: {key: value, ...}, ...}
         """
-        prefs = cls.get_preferences(customer_code)
-        result: dict[str, dict[str, Any]] = {}
-        for pref in prefs:
-            if pref.category not in result:
-                result[pref.category] = {}
-            result[pref.category][pref.key] = pref.value
+        key = _preferences_cache_key(customer_code)
+        result = cache.get(key)
+        if result is None:
+            result = {}
+            # Only the three columns the dict needs; no model instances
+            rows = CustomerPreference.objects.filter(
+                customer__code=customer_code,
+                customer__is_active=True,
+            ).values_list("category", "key", "value")
+            for category, pref_key, value in rows.iterator(chunk_size=500):
+                result.setdefault(category, {})[pref_key] = value
+            cache.set(key, result, PREFERENCES_CACHE_TTL)
         return result
 
     @classmethod
@@ -149,13 +229,15 @@ class PreferenceService:
             category=category,
             key=key,
         ).delete()
+        if deleted:
+            invalidate_preferences_cache(customer_code)
         return deleted > 0
 
     @classmethod
     def get_restrictions(cls, customer_code: str) -> list[CustomerPreference]:
         """Get all restrictions for a customer."""
         return list(
-            CustomerPreference.objects.filter(
+            CustomerPreference.objects.select_related("customer").filter(
                 customer__code=customer_code,
                 customer__is_active=True,
                 preference_type=PreferenceType.RESTRICTION,
@@ -3,11 +3,12 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
+from guestman.admin import CustomerLinkMixin
 from guestman.contrib.timeline.models import TimelineEvent
 
 
 @admin.register(TimelineEvent)
-class TimelineEventAdmin(admin.ModelAdmin):
+class TimelineEventAdmin(CustomerLinkMixin, admin.ModelAdmin):
     list_display = [
         "created_at",
         "event_type_badge",
@@ -18,6 +19,7 @@ class TimelineEventAdmin(admin.ModelAdmin):
     list_filter = ["event_type", "channel"]
     search_fields = ["customer__code", "customer__first_name", "title", "reference"]
     raw_id_fields = ["customer"]
+    list_select_related = ["customer"]
     readonly_fields = ["created_at"]
     date_hierarchy = "created_at"
     ordering = ["-created_at"]
@@ -40,11 +42,3 @@ class TimelineEventAdmin(admin.ModelAdmin):
         )
 
     event_type_badge.short_description = "Tipo"
-
-    def customer_link(self, obj):
-        from django.urls import reverse
-
-        url = reverse("admin:guestman_customer_change", args=[obj.customer.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.customer.code)
-
-    customer_link.short_description = "Cliente"
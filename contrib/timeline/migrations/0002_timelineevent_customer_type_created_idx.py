@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guestman_timeline', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timelineevent',
+            name='guestman_ti_custome_807b67_idx',
+        ),
+        migrations.AddIndex(
+            model_name='timelineevent',
+            index=models.Index(fields=['customer', 'event_type', '-created_at'], name='guestman_ti_custome_125935_idx'),
+        ),
+    ]
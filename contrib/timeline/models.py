@@ -90,7 +90,7 @@ class TimelineEvent(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["customer", "-created_at"]),
-            models.Index(fields=["customer", "event_type"]),
+            models.Index(fields=["customer", "event_type", "-created_at"]),
         ]
 
     def __str__(self):
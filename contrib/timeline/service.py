@@ -4,6 +4,7 @@ import logging
 
 from guestman.contrib.timeline.models import TimelineEvent
 from guestman.models import Customer
+from guestman.services import customer as customer_service
 
 logger = logging.getLogger(__name__)
 
@@ -46,10 +47,54 @@ class TimelineService:
         Raises:
             Customer.DoesNotExist: If customer not found
         """
-        customer = Customer.objects.get(code=customer_code, is_active=True)
+        customer_id = customer_service.get_id(customer_code)
+        if customer_id is None:
+            raise Customer.DoesNotExist(f"Customer {customer_code} not found")
+
+        return cls.log_event_by_id(
+            customer_id,
+            event_type,
+            title,
+            description=description,
+            channel=channel,
+            reference=reference,
+            metadata=metadata,
+            created_by=created_by,
+        )
 
+    @classmethod
+    def log_event_by_id(
+        cls,
+        customer_id: int,
+        event_type: str,
+        title: str,
+        description: str = "",
+        channel: str = "",
+        reference: str = "",
+        metadata: dict | None = None,
+        created_by: str = "",
+    ) -> TimelineEvent:
+        """
+        Record an event for a customer whose primary key is already known.
+
+        Skips the customer lookup (and its is_active check) done by
+        log_event; meant for callers that just loaded or created the customer.
+
+        Args:
+            customer_id: Customer primary key
+            event_type: Type (order, contact, note, visit, loyalty, system)
+            title: Short summary of the event
+            description: Detailed description
+            channel: Origin channel (whatsapp, pdv, ecommerce)
+            reference: External reference (order:123, ticket:456)
+            metadata: Extra data as JSON
+            created_by: Who created the event
+
+        Returns:
+            Created TimelineEvent
+        """
         return TimelineEvent.objects.create(
-            customer=customer,
+            customer_id=customer_id,
             event_type=event_type,
             title=title,
             description=description,
@@ -59,6 +104,46 @@ class TimelineService:
             created_by=created_by,
         )
 
+    @classmethod
+    def log_events(cls, events: list[dict], batch_size: int = 500) -> list[TimelineEvent]:
+        """
+        Record many events at once (webhook batches, imports).
+
+        Customers are resolved in one query and events written with
+        multi-row INSERTs. Events whose customer is missing or inactive
+        are skipped.
+
+        Args:
+            events: Dicts with customer_code, event_type, title and optional
+                description, channel, reference, metadata, created_by
+            batch_size: Rows per INSERT statement
+
+        Returns:
+            Created TimelineEvents, in input order
+        """
+        codes = {event["customer_code"] for event in events}
+        customer_ids = dict(
+            Customer.objects.filter(code__in=codes, is_active=True).values_list(
+                "code", "id"
+            )
+        )
+
+        objs = [
+            TimelineEvent(
+                customer_id=customer_ids[event["customer_code"]],
+                event_type=event["event_type"],
+                title=event["title"],
+                description=event.get("description", ""),
+                channel=event.get("channel", ""),
+                reference=event.get("reference", ""),
+                metadata=event.get("metadata") or {},
+                created_by=event.get("created_by", ""),
+            )
+            for event in events
+            if event["customer_code"] in customer_ids
+        ]
+        return TimelineEvent.objects.bulk_create(objs, batch_size=batch_size)
+
     @classmethod
     def get_timeline(
         cls,
@@ -12,10 +12,14 @@ G6: MergeSafety - Merge requires strong evidence
 import hashlib
 import hmac
 import time
+from contextlib import nullcontext
 from dataclasses import dataclass
 
 from django.db import IntegrityError, transaction
 
+# SQLSTATE for unique_violation (PostgreSQL)
+_UNIQUE_VIOLATION = "23505"
+
 
 class GateError(Exception):
     """Gate validation error."""
@@ -295,14 +299,22 @@ class Gates:
                 "Nonce is required.",
             )
 
-        # Try to create record - unique constraint will prevent duplicates
+        # Try to create record - unique constraint will prevent duplicates.
+        # A lone INSERT is atomic; the savepoint is only needed so a failed
+        # INSERT does not break an enclosing transaction.
+        in_transaction = transaction.get_connection().in_atomic_block
         try:
-            with transaction.atomic():
+            with transaction.atomic() if in_transaction else nullcontext():
                 ProcessedEvent.objects.create(nonce=nonce, provider=provider)
-        except IntegrityError:
-            # IntegrityError means nonce already exists = replay
-            # Check if it actually exists (could be other DB error)
-            if ProcessedEvent.objects.filter(nonce=nonce).exists():
+        except IntegrityError as exc:
+            # IntegrityError means nonce already exists = replay.
+            # PostgreSQL reports unique violations as SQLSTATE 23505; other
+            # backends need a lookup to rule out a different DB error.
+            cause = exc.__cause__
+            sqlstate = getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+            if sqlstate == _UNIQUE_VIOLATION or (
+                sqlstate is None and ProcessedEvent.objects.filter(nonce=nonce).exists()
+            ):
                 raise GateError(
                     "G5_ReplayProtection",
                     "Replay detected: event already processed.",
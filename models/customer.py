@@ -127,6 +127,29 @@ class Customer(models.Model):
         """Customer's default address."""
         return self.addresses.filter(is_default=True).first()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored code/is_active, compared in post_save cache receivers
+        if "code" in instance.__dict__ and "is_active" in instance.__dict__:
+            instance._stored_code_status = (instance.code, instance.is_active)
+        return instance
+
+    def stale_cache_codes(self) -> set[str]:
+        """
+        Codes whose code-keyed cache entries are stale after saving this instance.
+
+        Empty when code and is_active match the values loaded from (or last
+        saved to) the database. When those are unknown (deferred fields, a
+        new instance) the current code is returned.
+        """
+        stored = getattr(self, "_stored_code_status", None)
+        if stored is None:
+            return {self.code}
+        if stored == (self.code, self.is_active):
+            return set()
+        return {stored[0], self.code}
+
     def save(self, *args, **kwargs):
         # Normalize phone using centralized function
         if self.phone:
@@ -148,6 +171,10 @@ class Customer(models.Model):
 
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"code", "is_active"} <= set(update_fields):
+            self._stored_code_status = (self.code, self.is_active)
+
         # Sync cache → ContactPoint (source of truth)
         self._sync_contact_points()
 
@@ -8,7 +8,9 @@ from guestman.protocols.customer import (
     CustomerValidationResult,
 )
 from guestman.protocols.orders import (
+    BulkOrderHistoryBackend,
     OrderHistoryBackend,
+    OrderPatternBackend,
     OrderSummary,
     OrderStats,
 )
@@ -21,7 +23,9 @@ __all__ = [
     "CustomerContext",
     "CustomerValidationResult",
     # Orders
+    "BulkOrderHistoryBackend",
     "OrderHistoryBackend",
+    "OrderPatternBackend",
     "OrderSummary",
     "OrderStats",
 ]
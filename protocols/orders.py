@@ -73,3 +73,94 @@ class OrderHistoryBackend(Protocol):
             OrderStats with totals and averages
         """
         ...
+
+
+@runtime_checkable
+class BulkOrderHistoryBackend(OrderHistoryBackend, Protocol):
+    """
+    OrderHistoryBackend that can also answer for many customers at once.
+
+    Optional: InsightService.recalculate_all() uses these methods when the
+    configured backend provides them, one call per batch of customers
+    instead of one per customer.
+    """
+
+    def get_customer_orders_bulk(
+        self,
+        customer_codes: list[str],
+        limit: int = 10,
+    ) -> dict[str, list[OrderSummary]]:
+        """
+        Return last orders for each customer.
+
+        Args:
+            customer_codes: Customer codes
+            limit: Maximum orders per customer
+
+        Returns:
+            Dict of customer code -> list of OrderSummary (most recent first),
+            with an empty list for customers without orders
+        """
+        ...
+
+    def get_order_stats_bulk(
+        self,
+        customer_codes: list[str],
+    ) -> dict[str, OrderStats]:
+        """
+        Return aggregated order statistics for each customer.
+
+        Args:
+            customer_codes: Customer codes
+
+        Returns:
+            Dict of customer code -> OrderStats, with zeroed stats for
+            customers without orders
+        """
+        ...
+
+
+@runtime_checkable
+class OrderPatternBackend(Protocol):
+    """
+    Optional narrow read of recent orders: only (ordered_at, channel_code).
+
+    InsightService only needs these two values for pattern analysis
+    (preferred weekday/hour/channel). Backends that implement this avoid
+    fetching and building full OrderSummary rows for it.
+    """
+
+    def get_customer_order_patterns(
+        self,
+        customer_code: str,
+        limit: int = 10,
+    ) -> list[tuple[datetime, str]]:
+        """
+        Return (ordered_at, channel_code) of last orders for customer.
+
+        Args:
+            customer_code: Customer code
+            limit: Maximum orders to return
+
+        Returns:
+            List of tuples ordered by date (most recent first)
+        """
+        ...
+
+    def get_customer_order_patterns_bulk(
+        self,
+        customer_codes: list[str],
+        limit: int = 10,
+    ) -> dict[str, list[tuple[datetime, str]]]:
+        """
+        Return (ordered_at, channel_code) of last orders for each customer.
+
+        Args:
+            customer_codes: Customer codes
+            limit: Maximum orders per customer
+
+        Returns:
+            Dict of customer code -> list of tuples (most recent first),
+            with an empty list for customers without orders
+        """
+        ...
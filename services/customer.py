@@ -37,6 +37,15 @@ def get(code: str) -> Customer | None:
         return None
 
 
+def get_id(code: str) -> int | None:
+    """Get active customer's primary key by code (no instance is built)."""
+    return (
+        Customer.objects.filter(code=code, is_active=True)
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
 def get_by_uuid(uuid: str) -> Customer | None:
     """Get customer by UUID."""
     try:
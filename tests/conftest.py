@@ -3,6 +3,7 @@
 from decimal import Decimal
 
 import pytest
+from django.core.cache import cache
 
 from guestman.models import (
     Customer,
@@ -22,6 +23,14 @@ except ImportError:
     CustomerInsight = None
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Service-level caches must not leak between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def group_regular(db):
     """Create regular customer group."""
@@ -0,0 +1,133 @@
+"""
+Tests for the Omniman order history adapter.
+
+Omniman is not a test dependency: a minimal Order/Channel pair with the
+fields the adapter reads is created on the test database instead.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from django.db import connection, models
+from django.test.utils import isolate_apps
+
+from guestman.adapters import omniman_orders
+from guestman.adapters.omniman_orders import OmnimanOrderHistoryBackend
+
+
+@pytest.fixture
+def order_model(transactional_db, monkeypatch):
+    """Fake omniman.Order (with Channel) backed by real tables."""
+    with isolate_apps("guestman"):
+
+        class Channel(models.Model):
+            code = models.CharField(max_length=20)
+
+            class Meta:
+                app_label = "guestman"
+                db_table = "test_omniman_channel"
+
+        class Order(models.Model):
+            ref = models.CharField(max_length=20)
+            customer_ref = models.CharField(max_length=20)
+            channel = models.ForeignKey(Channel, null=True, on_delete=models.SET_NULL)
+            created_at = models.DateTimeField()
+            snapshot = models.JSONField(default=dict)
+            status = models.CharField(max_length=20, default="new")
+
+            class Meta:
+                app_label = "guestman"
+                db_table = "test_omniman_order"
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Channel)
+        editor.create_model(Order)
+    monkeypatch.setattr(omniman_orders, "_order_model", lambda: Order)
+
+    yield Order
+
+    with connection.schema_editor() as editor:
+        editor.delete_model(Order)
+        editor.delete_model(Channel)
+
+
+@pytest.fixture
+def orders(order_model):
+    """Three orders for CUST-A (oldest first) and one for CUST-B."""
+    Channel = order_model._meta.get_field("channel").related_model
+    web = Channel.objects.create(code="web")
+    base = datetime(2024, 1, 1, 12, 0, tzinfo=UTC)
+
+    def create(ref, customer_ref, days, channel=None, snapshot=None):
+        return order_model.objects.create(
+            ref=ref,
+            customer_ref=customer_ref,
+            channel=channel,
+            created_at=base + timedelta(days=days),
+            snapshot=snapshot or {},
+        )
+
+    create("A-1", "CUST-A", 0, web, {"pricing": {"total_q": 1000}, "items": [{}, {}]})
+    create("A-2", "CUST-A", 1, None, {"pricing": {"total_q": 2500}, "items": [{}]})
+    create("A-3", "CUST-A", 2, web, {"pricing": {"total_q": 500}})
+    create("B-1", "CUST-B", 0, web, {"pricing": {"total_q": 700}, "items": [{}, {}, {}]})
+    return base
+
+
+class TestOmnimanOrderHistoryBackend:
+    """Adapter queries against a fake Order table on SQLite."""
+
+    def test_latest_per_customer_limits_each_customer(self, order_model, orders):
+        """ROW_NUMBER() keeps the most recent orders of each customer."""
+        refs = list(
+            omniman_orders._latest_per_customer(order_model, ["CUST-A", "CUST-B"], 2).values_list(
+                "customer_ref", "ref"
+            )
+        )
+        assert refs == [("CUST-A", "A-3"), ("CUST-A", "A-2"), ("CUST-B", "B-1")]
+
+    def test_get_customer_orders_bulk(self, orders):
+        """Summaries map totals, channels and item counts per customer."""
+        result = OmnimanOrderHistoryBackend().get_customer_orders_bulk(
+            ["CUST-A", "CUST-B", "CUST-C"], limit=2
+        )
+
+        assert [o.order_ref for o in result["CUST-A"]] == ["A-3", "A-2"]
+        latest, previous = result["CUST-A"]
+        assert (latest.channel_code, latest.total_q, latest.items_count) == ("web", 500, 0)
+        assert (previous.channel_code, previous.total_q, previous.items_count) == ("", 2500, 1)
+        assert result["CUST-B"][0].items_count == 3
+        assert result["CUST-C"] == []
+
+    def test_get_customer_orders_bulk_matches_single(self, orders):
+        """Bulk rows equal the per-customer query."""
+        backend = OmnimanOrderHistoryBackend()
+        bulk = backend.get_customer_orders_bulk(["CUST-A", "CUST-B"], limit=10)
+
+        for code in ("CUST-A", "CUST-B"):
+            assert bulk[code] == backend.get_customer_orders(code, limit=10)
+
+    def test_get_order_stats_bulk(self, orders):
+        """Stats are aggregated per customer; unknown customers get zeros."""
+        stats = OmnimanOrderHistoryBackend().get_order_stats_bulk(["CUST-A", "CUST-B", "CUST-C"])
+
+        assert stats["CUST-A"].total_orders == 3
+        assert stats["CUST-A"].total_spent_q == 4000
+        assert stats["CUST-A"].average_order_q == 1333
+        assert stats["CUST-A"].first_order_at == orders
+        assert stats["CUST-A"].last_order_at == orders + timedelta(days=2)
+        assert stats["CUST-B"].total_spent_q == 700
+        assert stats["CUST-C"].total_orders == 0
+        assert stats["CUST-C"].last_order_at is None
+
+    def test_get_customer_order_patterns_bulk(self, orders):
+        """Patterns are (ordered_at, channel_code), most recent first."""
+        patterns = OmnimanOrderHistoryBackend().get_customer_order_patterns_bulk(
+            ["CUST-A", "CUST-C"], limit=2
+        )
+
+        assert patterns["CUST-A"] == [
+            (orders + timedelta(days=2), "web"),
+            (orders + timedelta(days=1), ""),
+        ]
+        assert patterns["CUST-C"] == []
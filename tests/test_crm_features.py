@@ -248,6 +248,23 @@ class TestTimelineService:
         assert event.title == "Pedido #123 confirmado"
         assert event.customer == customer
 
+    def test_log_event_by_id(self, customer):
+        """Log a timeline event by customer primary key."""
+        event = TimelineService.log_event_by_id(customer.pk, "note", "Cliente VIP")
+        assert event.customer_id == customer.pk
+        assert TimelineService.get_timeline("CRM-001") == [event]
+
+    def test_log_events(self, customer):
+        """Log a batch of events, skipping unknown customers."""
+        events = TimelineService.log_events([
+            {"customer_code": "CRM-001", "event_type": "order", "title": "Pedido 1"},
+            {"customer_code": "MISSING", "event_type": "order", "title": "Pedido 2"},
+            {"customer_code": "CRM-001", "event_type": "contact", "title": "WhatsApp"},
+        ])
+
+        assert [e.title for e in events] == ["Pedido 1", "WhatsApp"]
+        assert len(TimelineService.get_timeline("CRM-001")) == 2
+
     def test_get_timeline(self, customer):
         """Get timeline returns events in reverse chronological order."""
         TimelineService.log_event("CRM-001", "order", "Pedido 1")
@@ -342,6 +359,45 @@ class TestConsentService:
         assert consent.status == "opted_out"
         assert consent.revoked_at is not None
 
+    def test_has_consent_cache_invalidated_on_revoke(self, customer):
+        """Cached has_consent result is dropped when consent changes."""
+        ConsentService.grant_consent("CRM-001", "whatsapp")
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is True
+
+        CommunicationConsent.objects.filter(
+            customer=customer, channel="whatsapp"
+        ).get().delete()
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is False
+
+    def test_has_consent_false_after_deactivation(self, customer):
+        """A cached opt-in does not outlive the customer's deactivation."""
+        ConsentService.grant_consent("CRM-001", "whatsapp")
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is True
+
+        customer.is_active = False
+        customer.save()
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is False
+
+    def test_has_consent_false_after_deactivating_loaded_customer(self, customer):
+        """A customer read from the database invalidates on save as well."""
+        ConsentService.grant_consent("CRM-001", "whatsapp")
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is True
+
+        loaded = Customer.objects.get(code="CRM-001")
+        loaded.is_active = False
+        loaded.save(update_fields=["is_active"])
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is False
+
+    def test_has_consent_follows_code_change(self, customer):
+        """After a code change the consent answers under the new code only."""
+        ConsentService.grant_consent("CRM-001", "whatsapp")
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is True
+
+        customer.code = "CRM-001-NEW"
+        customer.save()
+        assert ConsentService.has_consent("CRM-001", "whatsapp") is False
+        assert ConsentService.has_consent("CRM-001-NEW", "whatsapp") is True
+
     def test_re_grant_after_revoke(self, customer):
         """Can re-grant consent after revocation."""
         ConsentService.grant_consent("CRM-001", "whatsapp")
@@ -368,6 +424,26 @@ class TestConsentService:
         channels = ConsentService.get_opted_in_channels("CRM-001")
         assert set(channels) == {"whatsapp", "email"}
 
+    def test_get_opted_in_channels_cache_invalidated(self, customer):
+        """Cached channel list follows grant and revoke."""
+        ConsentService.grant_consent("CRM-001", "whatsapp")
+        assert ConsentService.get_opted_in_channels("CRM-001") == ["whatsapp"]
+
+        ConsentService.grant_consent("CRM-001", "email")
+        assert set(ConsentService.get_opted_in_channels("CRM-001")) == {"whatsapp", "email"}
+
+        ConsentService.revoke_consent("CRM-001", "whatsapp")
+        assert ConsentService.get_opted_in_channels("CRM-001") == ["email"]
+
+    def test_get_opted_in_channels_empty_after_deactivation(self, customer):
+        """A cached channel list does not outlive the customer's deactivation."""
+        ConsentService.grant_consent("CRM-001", "whatsapp")
+        assert ConsentService.get_opted_in_channels("CRM-001") == ["whatsapp"]
+
+        customer.is_active = False
+        customer.save(update_fields=["is_active"])
+        assert ConsentService.get_opted_in_channels("CRM-001") == []
+
     def test_get_marketable_customers(self, customer, customer_b):
         """Get customers with active consent for a channel."""
         ConsentService.grant_consent("CRM-001", "whatsapp")
@@ -377,6 +453,25 @@ class TestConsentService:
         marketable = ConsentService.get_marketable_customers("whatsapp")
         assert marketable == ["CRM-001"]
 
+    def test_get_marketable_customers_iter(self, customer, customer_b):
+        """Iterator variant yields the same audience."""
+        ConsentService.grant_consent("CRM-001", "email")
+        ConsentService.grant_consent("CRM-002", "email")
+
+        codes = ConsentService.get_marketable_customers_iter("email", chunk_size=1)
+        assert sorted(codes) == ["CRM-001", "CRM-002"]
+
+    def test_has_consent_bulk(self, customer, customer_b):
+        """Bulk check returns only opted-in codes."""
+        ConsentService.grant_consent("CRM-001", "whatsapp")
+        ConsentService.grant_consent("CRM-002", "whatsapp")
+        ConsentService.revoke_consent("CRM-002", "whatsapp")
+
+        allowed = ConsentService.has_consent_bulk(
+            ["CRM-001", "CRM-002", "CRM-404"], "whatsapp"
+        )
+        assert allowed == {"CRM-001"}
+
     def test_unique_per_customer_channel(self, customer):
         """Only one consent record per (customer, channel)."""
         ConsentService.grant_consent("CRM-001", "whatsapp")
@@ -388,6 +483,15 @@ class TestConsentService:
         ).count()
         assert count == 1
 
+    def test_regrant_returns_stored_row(self, customer):
+        """Granting an existing consent returns the stored record."""
+        first = ConsentService.grant_consent("CRM-001", "whatsapp")
+        second = ConsentService.grant_consent("CRM-001", "whatsapp", source="updated")
+
+        assert second.pk == first.pk
+        assert second.created_at == first.created_at
+        assert second.source == "updated"
+
     def test_consent_with_ip(self, customer):
         """Consent records IP address."""
         consent = ConsentService.grant_consent(
@@ -488,6 +592,20 @@ class TestLoyaltyService:
         assert account.stamps_current == 0
         assert account.stamps_completed == 1
 
+    def test_stamp_returns_full_account_after_earn_and_redeem(self, customer):
+        """add_stamp returns the whole account row with current points and tier."""
+        LoyaltyService.enroll("CRM-001")
+        LoyaltyService.earn_points("CRM-001", 600, "Big order")
+        LoyaltyService.redeem_points("CRM-001", 100, "Desconto")
+
+        account, _ = LoyaltyService.add_stamp("CRM-001", "Compra")
+
+        assert account.get_deferred_fields() == set()
+        assert account.points_balance == 500
+        assert account.lifetime_points == 600
+        assert account.tier == "silver"
+        assert account.customer == customer
+
     def test_tier_auto_upgrade(self, customer):
         """Tier upgrades automatically based on lifetime points."""
         LoyaltyService.enroll("CRM-001")
@@ -502,6 +620,21 @@ class TestLoyaltyService:
         account = LoyaltyService.get_account("CRM-001")
         assert account.tier == "gold"
 
+    def test_bulk_earn_points(self, customer):
+        """Bulk earn accumulates per customer and upgrades tier."""
+        LoyaltyService.enroll("CRM-001")
+
+        txs = LoyaltyService.bulk_earn_points([
+            ("CRM-001", 300, "Campanha 1"),
+            ("CRM-001", 300, "Campanha 2"),
+        ])
+
+        assert [tx.balance_after for tx in txs] == [300, 600]
+        account = LoyaltyService.get_account("CRM-001")
+        assert account.points_balance == 600
+        assert account.tier == "silver"
+        assert len(LoyaltyService.get_transactions("CRM-001")) == 2
+
     def test_get_transactions(self, customer):
         """Get transaction history."""
         LoyaltyService.enroll("CRM-001")
@@ -512,6 +645,15 @@ class TestLoyaltyService:
         txs = LoyaltyService.get_transactions("CRM-001")
         assert len(txs) == 3
 
+    def test_iter_transactions(self, customer):
+        """Iterate full transaction history, newest first."""
+        LoyaltyService.enroll("CRM-001")
+        LoyaltyService.earn_points("CRM-001", 100, "Pedido 1")
+        LoyaltyService.redeem_points("CRM-001", 30, "Desconto")
+
+        txs = list(LoyaltyService.iter_transactions("CRM-001", chunk_size=1))
+        assert [tx.points for tx in txs] == [-30, 100]
+
     def test_earn_zero_raises(self, customer):
         """Earning 0 or negative points raises."""
         LoyaltyService.enroll("CRM-001")
@@ -26,7 +26,7 @@ from django.test import RequestFactory
 from guestman.contrib.manychat.service import ManychatService
 from guestman.contrib.manychat.views import ManychatWebhookView
 from guestman.contrib.identifiers.models import CustomerIdentifier, IdentifierType
-from guestman.models import Customer
+from guestman.models import Customer, CustomerGroup
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -193,6 +193,67 @@ class TestManychatServiceSync:
         assert " " not in stored_phone
         assert "-" not in stored_phone
 
+    def test_numeric_platform_ids_stored_as_strings(self):
+        """Numeric Facebook/Telegram IDs are stored as their string form."""
+        customer, created = ManychatService.sync_subscriber(
+            {"id": "mc-numeric-001", "fb_id": 123456789, "tg_id": 42}
+        )
+        assert created is True
+
+        values = dict(
+            CustomerIdentifier.objects.filter(customer=customer).values_list(
+                "identifier_type", "identifier_value"
+            )
+        )
+        assert values[IdentifierType.FACEBOOK] == "123456789"
+        assert values[IdentifierType.TELEGRAM] == "42"
+        assert values[IdentifierType.MANYCHAT] == "mc-numeric-001"
+
+    def test_link_keeps_single_manychat_primary(self, existing_customer):
+        """Linking a second Manychat ID leaves one primary Manychat identifier."""
+        for id_type, value, is_primary in (
+            (IdentifierType.MANYCHAT, "mc-old-001", True),
+            (IdentifierType.PHONE, "5511988776655", False),
+        ):
+            CustomerIdentifier.objects.create(
+                customer=existing_customer,
+                identifier_type=id_type,
+                identifier_value=value,
+                is_primary=is_primary,
+                source_system="manual",
+            )
+
+        customer, created = ManychatService.sync_subscriber({"id": "mc-new-001", "phone": "5511988776655"})
+
+        assert created is False
+        assert customer.pk == existing_customer.pk
+        rows = CustomerIdentifier.objects.filter(
+            customer=existing_customer, identifier_type=IdentifierType.MANYCHAT
+        ).order_by("identifier_value")
+        assert list(rows.values_list("identifier_value", "is_primary")) == [
+            ("mc-new-001", False),
+            ("mc-old-001", True),
+        ]
+
+    def test_update_keeps_default_group_assignment(self, existing_customer):
+        """A partial update still stores the default group save() assigns."""
+        assert existing_customer.group_id is None
+        default_group = CustomerGroup.objects.create(code="regular", name="Regular", is_default=True)
+        CustomerIdentifier.objects.create(
+            customer=existing_customer,
+            identifier_type=IdentifierType.EMAIL,
+            identifier_value="joao@example.com",
+            source_system="manual",
+        )
+
+        ManychatService.sync_subscriber(
+            {"id": "mc-group-001", "email": "joao@example.com", "custom_fields": {"tier": "gold"}}
+        )
+
+        existing_customer.refresh_from_db()
+        assert existing_customer.group_id == default_group.pk
+        assert existing_customer.metadata["manychat_custom_fields"] == {"tier": "gold"}
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Webhook Tests
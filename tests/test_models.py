@@ -90,6 +90,20 @@ class TestCustomer:
         """Test default_address property."""
         assert customer.default_address == customer_address
 
+    def test_stale_cache_codes(self, customer):
+        """Test stale_cache_codes tracks code/is_active against the stored row."""
+        loaded = Customer.objects.get(pk=customer.pk)
+        assert loaded.stale_cache_codes() == set()
+
+        loaded.code = "CUST-RENAMED"
+        assert loaded.stale_cache_codes() == {"CUST-001", "CUST-RENAMED"}
+
+        loaded.save()
+        assert loaded.stale_cache_codes() == set()
+
+        deferred = Customer.objects.only("id", "code").get(pk=customer.pk)
+        assert deferred.stale_cache_codes() == {"CUST-RENAMED"}
+
 
 class TestCustomerIdentifier:
     """Tests for CustomerIdentifier model."""
@@ -137,6 +151,53 @@ class TestCustomerIdentifier:
                 identifier_value="unique@example.com",
             )
 
+    def test_single_primary_per_type(self, customer):
+        """A new primary demotes the previous one; re-saving keeps it."""
+        first = CustomerIdentifier.objects.create(
+            customer=customer,
+            identifier_type=IdentifierType.INSTAGRAM,
+            identifier_value="first",
+            is_primary=True,
+        )
+        second = CustomerIdentifier.objects.create(
+            customer=customer,
+            identifier_type=IdentifierType.INSTAGRAM,
+            identifier_value="second",
+            is_primary=True,
+        )
+        first.refresh_from_db()
+        assert first.is_primary is False
+
+        reloaded = CustomerIdentifier.objects.get(pk=second.pk)
+        reloaded.verified_at = None
+        reloaded.save()
+        assert CustomerIdentifier.objects.filter(
+            customer=customer, identifier_type=IdentifierType.INSTAGRAM, is_primary=True
+        ).count() == 1
+
+    def test_stale_primary_resave_keeps_single_primary(self, customer):
+        """Re-saving a stale primary instance demotes the newer primary."""
+        stale = CustomerIdentifier.objects.create(
+            customer=customer,
+            identifier_type=IdentifierType.EMAIL,
+            identifier_value="a@example.com",
+            is_primary=True,
+        )
+        stale = CustomerIdentifier.objects.get(pk=stale.pk)
+        CustomerIdentifier.objects.create(
+            customer=customer,
+            identifier_type=IdentifierType.EMAIL,
+            identifier_value="b@example.com",
+            is_primary=True,
+        )
+
+        stale.save()
+
+        primaries = CustomerIdentifier.objects.filter(
+            customer=customer, identifier_type=IdentifierType.EMAIL, is_primary=True
+        )
+        assert list(primaries.values_list("identifier_value", flat=True)) == ["a@example.com"]
+
 
 class TestCustomerAddress:
     """Tests for CustomerAddress model."""
@@ -1,9 +1,10 @@
 """Tests for Guestman services."""
 
 from decimal import Decimal
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
 
 import pytest
+from django.forms.models import model_to_dict
 from django.utils import timezone
 
 # Core services
@@ -17,6 +18,9 @@ from guestman.contrib.identifiers import IdentifierService
 
 # Contrib models
 from guestman.contrib.identifiers.models import CustomerIdentifier, IdentifierType
+from guestman.contrib.insights import service as insights_service
+from guestman.contrib.insights.models import CustomerInsight
+from guestman.protocols.orders import OrderStats, OrderSummary
 
 
 pytestmark = pytest.mark.django_db
@@ -35,6 +39,11 @@ class TestCustomerService:
         result = customer_service.get("NONEXISTENT")
         assert result is None
 
+    def test_get_id(self, customer):
+        """Test resolving customer primary key by code."""
+        assert customer_service.get_id("CUST-001") == customer.pk
+        assert customer_service.get_id("NONEXISTENT") is None
+
     def test_get_by_document(self, db, group_regular):
         """Test getting customer by document."""
         from guestman.models import Customer
@@ -159,6 +168,46 @@ class TestPreferenceService:
         )
         assert pref.value == "croissant"
 
+    def test_get_preferences_dict_cache_invalidated(self, customer, customer_preference):
+        """Test cached preferences dict reflects writes through the service."""
+        assert PreferenceService.get_preferences_dict("CUST-001") == {"dietary": {"lactose_free": True}}
+
+        PreferenceService.set_preference("CUST-001", "dietary", "lactose_free", False)
+        assert PreferenceService.get_preference("CUST-001", "dietary", "lactose_free") is False
+
+        PreferenceService.delete_preference("CUST-001", "dietary", "lactose_free")
+        assert PreferenceService.get_preferences_dict("CUST-001") == {}
+
+    def test_get_preferences_dict_empty_after_deactivation(self, customer, customer_preference):
+        """Test cached preferences are not served once the customer is deactivated."""
+        assert PreferenceService.get_preference("CUST-001", "dietary", "lactose_free") is True
+
+        customer.is_active = False
+        customer.save()
+        assert PreferenceService.get_preferences_dict("CUST-001") == {}
+        assert PreferenceService.get_preference("CUST-001", "dietary", "lactose_free") is None
+
+    def test_get_preferences_dict_follows_code_change(self, customer, customer_preference):
+        """Test a renamed customer's preferences are not served under the old code."""
+        assert PreferenceService.get_preferences_dict("CUST-001") == {"dietary": {"lactose_free": True}}
+
+        customer.code = "CUST-001-NEW"
+        customer.save()
+        assert PreferenceService.get_preferences_dict("CUST-001") == {}
+        assert PreferenceService.get_preferences_dict("CUST-001-NEW") == {"dietary": {"lactose_free": True}}
+
+    def test_set_preferences_bulk(self, customer, customer_preference):
+        """Test bulk upsert updates existing and creates new preferences."""
+        count = PreferenceService.set_preferences_bulk([
+            {"customer_code": "CUST-001", "category": "dietary", "key": "lactose_free", "value": False},
+            {"customer_code": "CUST-001", "category": "flavor", "key": "favorite_bread", "value": "brioche"},
+            {"customer_code": "CUST-001", "category": "flavor", "key": "favorite_bread", "value": "croissant"},
+        ])
+
+        assert count == 2
+        assert PreferenceService.get_preference("CUST-001", "dietary", "lactose_free") is False
+        assert PreferenceService.get_preference("CUST-001", "flavor", "favorite_bread") == "croissant"
+
     def test_get_restrictions(self, customer, customer_preference):
         """Test getting restrictions."""
         # customer_preference fixture already creates a restriction
@@ -195,6 +244,75 @@ class TestInsightService:
         assert result.total_orders == 0
         assert result.total_spent_q == 0
 
+    def test_recalculate_unchanged_skips_save(self, customer):
+        """Test recalculating with identical results does not rewrite the row."""
+        first = InsightService.recalculate("CUST-001")
+        second = InsightService.recalculate("CUST-001")
+
+        second.refresh_from_db()
+        assert second.calculated_at == first.calculated_at
+
+    def test_recalculate_all_batches(self, customer, customer_insight, customer_vip):
+        """Test batch recalculation updates existing and creates missing insights."""
+        count = InsightService.recalculate_all(batch_size=1)
+
+        assert count == 2
+        customer_insight.refresh_from_db()
+        assert customer_insight.total_orders == 0
+        assert CustomerInsight.objects.get(customer=customer_vip).total_orders == 0
+
+    def test_recalculate_batch_matches_recalculate(self, monkeypatch, customer, customer_vip):
+        """Test the bulk batch path stores what recalculate() stores per customer."""
+        backend = FakeBulkOrderBackend()
+        monkeypatch.setattr(insights_service, "_get_order_backend", lambda: backend)
+        now = datetime(2024, 3, 1, 12, 0, tzinfo=UTC)
+
+        InsightService._recalculate_batch([customer, customer_vip], backend, now)
+        batch = {i.customer_id: model_to_dict(i, exclude=["id"]) for i in CustomerInsight.objects.all()}
+
+        CustomerInsight.objects.all().delete()
+        single = {
+            c.pk: model_to_dict(InsightService.recalculate(c.code, now=now), exclude=["id"])
+            for c in (customer, customer_vip)
+        }
+
+        assert batch == single
+        assert batch[customer.pk]["total_orders"] == 3
+        assert batch[customer.pk]["preferred_channel"] == "web"
+        assert batch[customer_vip.pk]["total_orders"] == 0
+
+
+class FakeBulkOrderBackend:
+    """In-memory BulkOrderHistoryBackend: three orders for CUST-001, none for others."""
+
+    ORDERS = {
+        "CUST-001": [
+            OrderSummary("O-3", "web", datetime(2024, 2, 20, 19, 0, tzinfo=UTC), 4000, 2, "completed"),
+            OrderSummary("O-2", "ifood", datetime(2024, 2, 10, 12, 0, tzinfo=UTC), 2500, 1, "completed"),
+            OrderSummary("O-1", "web", datetime(2024, 1, 5, 19, 30, tzinfo=UTC), 3500, 3, "completed"),
+        ],
+    }
+
+    def get_customer_orders(self, customer_code, limit=10):
+        return self.ORDERS.get(customer_code, [])[:limit]
+
+    def get_order_stats(self, customer_code):
+        orders = self.ORDERS.get(customer_code, [])
+        total = sum(o.total_q for o in orders)
+        return OrderStats(
+            total_orders=len(orders),
+            total_spent_q=total,
+            first_order_at=orders[-1].ordered_at if orders else None,
+            last_order_at=orders[0].ordered_at if orders else None,
+            average_order_q=total // len(orders) if orders else 0,
+        )
+
+    def get_customer_orders_bulk(self, customer_codes, limit=10):
+        return {code: self.get_customer_orders(code, limit) for code in customer_codes}
+
+    def get_order_stats_bulk(self, customer_codes):
+        return {code: self.get_order_stats(code) for code in customer_codes}
+
 
 class TestIdentifierService:
     """Tests for identifier service."""
@@ -253,6 +371,34 @@ class TestIdentifierService:
         assert ident.identifier_value == "johndoe"
         assert ident.customer == customer
 
+    def test_bulk_add_identifiers(self, customer):
+        """Test bulk import normalizes values and skips duplicates."""
+        count = IdentifierService.bulk_add_identifiers(
+            [
+                {
+                    "customer_code": "CUST-001",
+                    "identifier_type": IdentifierType.EMAIL,
+                    "identifier_value": " John@Example.com ",
+                    "is_primary": True,
+                },
+                {
+                    "customer_code": "CUST-001",
+                    "identifier_type": IdentifierType.EMAIL,
+                    "identifier_value": "john@example.com",
+                },
+                {
+                    "customer_code": "MISSING",
+                    "identifier_type": IdentifierType.EMAIL,
+                    "identifier_value": "ghost@example.com",
+                },
+            ]
+        )
+
+        assert count == 1
+        ident = CustomerIdentifier.objects.get(customer=customer)
+        assert ident.identifier_value == "john@example.com"
+        assert ident.is_primary is True
+
     def test_get_identifiers(self, customer):
         """Test getting all identifiers for customer."""
         CustomerIdentifier.objects.create(